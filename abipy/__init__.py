@@ -17,10 +17,14 @@ del sys
 from abipy.core import release
 
 # Release data
-__author__ = ''
-for author, email in release.authors.values():
-    __author__ += author + ' <' + email + '>\n'
-del author, email
+# __author__ is built from release.authors on first access so that importing abipy
+# does not need the packaging metadata (see the module-level __getattr__ in abipy.core.release).
+def __getattr__(name: str):
+    if name == "__author__":
+        value = globals()[name] = "".join(author + ' <' + email + '>\n'
+                                          for author, email in release.authors.values())
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __license__ = release.license
 __version__ = release.version
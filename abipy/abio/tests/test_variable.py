@@ -1,4 +1,5 @@
 """Tests for variable module."""
+import numpy as np
 import abipy.data as abidata
 
 from abipy.core.testing import AbipyTest
@@ -13,3 +14,42 @@ class TestInputVariable(AbipyTest):
         assert v.name == "ecut"
         assert not v.units
         assert str(v) == " ecut 5"
+
+        # Empty arrays and sequences are not printed.
+        assert str(InputVariable("foo", np.array([]))) == ""
+        assert str(InputVariable("foo", np.empty((0, 3)))) == ""
+        assert str(InputVariable("foo", [])) == ""
+        assert str(InputVariable("foo", ())) == ""
+        assert str(InputVariable("foo", "")) == ""
+
+    def test_format_list(self):
+        """Testing InputVariable with lists of values."""
+        v = InputVariable(name="acell", value=[1.0, 2.5, 1e-5])
+        assert str(v) == " acell    1.0    2.5   1.000d-05"
+
+        # The sign of -0.0 gives one more decimal, -2.0 has a positive fractional part.
+        v = InputVariable(name="shiftk", value=[-0.0])
+        assert str(v) == " shiftk   -0.00"
+        v = InputVariable(name="shiftk", value=np.array([0.5, -0.0, -2.0]))
+        assert str(v) == " shiftk    0.5   -0.00   -2.0"
+
+        v = InputVariable(name="ngkpt", value=[4, 4, 4])
+        assert str(v) == " ngkpt 4 4 4"
+
+        v = InputVariable(name="acell", value=[1, 2, 3, "angstrom"])
+        assert v.units == "angstrom"
+        assert str(v) == " acell 1 2 3 angstrom"
+
+        # Lists of lists.
+        v = InputVariable(name="foo", value=[[0.5, -0.0], [-2.0, 1.25]])
+        assert str(v) == " foo\n    0.50   -0.00\n   -2.00    1.25"
+        v = InputVariable(name="foo", value=[[1, 2], [30, 4]])
+        assert str(v) == " foo\n  1  2\n 30  4"
+        # np.float32 entries mixed with float keep their own number of decimals.
+        v = InputVariable(name="foo", value=[[np.float32(0.1), 0.25], [1.0, 2.5]])
+        assert str(v) == " foo\n    0.10    0.25\n    1.00    2.50"
+
+        v = InputVariable(name="xred", value=np.array([[0, 0, 0], [0.25, 0.25, 0.25]]))
+        assert str(v) == " xred\n" + \
+            "    0.0000000000    0.0000000000    0.0000000000\n" + \
+            "    0.2500000000    0.2500000000    0.2500000000"
@@ -1,7 +1,10 @@
 """Support for Abinit input variables."""
 from __future__ import annotations
 
+import re
 import string
+import functools
+import itertools
 import collections
 import numpy as np
 
@@ -28,6 +31,31 @@ _UNITS = {
     'eV': 0.03674932539796232,
 }
 
+_UNITS_KEYS = frozenset(_UNITS)
+
+# Variables whose name contains one of these substrings are printed with 16 decimals...
+_FLOATDEC_SUBSTR_RE = re.compile('|'.join(map(re.escape, ('xred', 'xcart', 'rprim', 'qpt', 'kpt'))))
+
+# ...with the exception of these exact names...
+_FLOATDEC_EXACT = {'qpt': 22}
+
+# ...and of these variables that do not require any decimal point.
+_FLOATDEC_ZERO_RE = re.compile('|'.join(map(re.escape, ('ngkpt', 'kptrlatt', 'ngqpt', 'ng2qpt'))))
+
+
+@functools.lru_cache(maxsize=512)
+def _get_floatdecimal(name: str) -> int:
+    """Return the number of decimal points to be enforced when printing variable `name`."""
+    if _FLOATDEC_ZERO_RE.search(name):
+        return 0
+    if name in _FLOATDEC_EXACT:
+        return _FLOATDEC_EXACT[name]
+    if _FLOATDEC_SUBSTR_RE.search(name):
+        return 16
+
+    # By default, do not impose a number of decimal points
+    return 0
+
 
 class InputVariable:
     """
@@ -51,8 +79,9 @@ class InputVariable:
         if name in ['bdgw']:
             self.valperline = 2
 
-        if (is_iter(self.value) and isinstance(self.value[-1], str) and self.value[-1] in _UNITS):
-            self.value = list(self.value)
+        value = self.value
+        if is_iter(value) and len(value) and isinstance(value[-1], str) and value[-1] in _UNITS_KEYS:
+            self.value = list(value)
             self._units = self.value.pop(-1)
 
     def get_value(self):
@@ -86,41 +115,28 @@ class InputVariable:
     def __str__(self) -> str:
         """Declaration of the variable in the input file."""
         value = self.value
-        if value is None or not str(value):
+        if value is None:
             return ''
 
-        var = self.name
-        line = ' ' + var
-
-        # By default, do not impose a number of decimal points
-        floatdecimal = 0
-
-        # For some inputs, enforce number of decimal points...
-        if any(inp in var for inp in ('xred', 'xcart', 'rprim', 'qpt', 'kpt')):
-            floatdecimal = 16
-            #floatdecimal = 32
-
-        if var == 'qpt':
-            floatdecimal = 22
-
-        # ...but not for those
-        if any(inp in var for inp in ('ngkpt', 'kptrlatt', 'ngqpt', 'ng2qpt')):
-            floatdecimal = 0
-
+        # Fast rejection of empty arrays and sequences.
+        # Numbers are never empty once converted to string so we avoid formatting them just to perform this test.
         if isinstance(value, np.ndarray):
-            n = 1
-            for i in np.shape(value):
-                n *= i
-            value = np.reshape(value, n)
-            value = list(value)
+            if value.size == 0:
+                return ''
+            value = value.ravel().tolist()
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                return ''
+        elif not isinstance(value, (int, float)) and not str(value):
+            return ''
+
+        line = ' ' + self.name
 
         # values in lists
         if isinstance(value, (list, tuple)):
-
-            # Reshape a list of lists into a single list
+            floatdecimal = _get_floatdecimal(self.name)
             if all(isinstance(v, (list, tuple)) for v in value):
                 line += self.format_list2d(value, floatdecimal)
-
             else:
                 line += self.format_list(value, floatdecimal)
 
@@ -172,67 +188,155 @@ class InputVariable:
         """
         Format a list of lists.
         """
-        lvals = flatten(values)
-
-        # Determine the representation
-        if all(isinstance(v, int) for v in lvals):
-            type_all = int
-        else:
-            try:
-                for v in lvals:
-                    float(v)
-                type_all = float
-            except Exception:
-                type_all = str
-
-        # Determine the format
-        width = max(len(str(s)) for s in lvals)
-        if type_all == int:
-            formatspec = '>{0}d'.format(width)
-        elif type_all == str:
-            formatspec = '>{0}'.format(width)
+        # Fast path for rectangular numerical tables: the rows are flat so we can chain them
+        # and classify all the entries in a single vectorized pass.
+        try:
+            arr = np.asarray(values)
+        except (ValueError, TypeError, OverflowError):
+            arr = None
+
+        if arr is not None and arr.ndim == 2 and arr.dtype.kind in 'iuf':
+            lvals = list(itertools.chain.from_iterable(values))
+            # The number of decimals depends on the type of each entry so the fast path is used
+            # only if numpy did not promote any of them (e.g. np.float32 mixed with float).
+            types = set(map(type, lvals))
+            if len(types) != 1 or np.dtype(types.pop()) != arr.dtype:
+                arr = None
         else:
+            arr = None
+
+        if arr is not None:
+            if all(isinstance(v, int) for v in lvals):
+                width = int(np.char.str_len(arr.astype(str)).max())
+                formatspec = '>{0}d'.format(width)
+            else:
+                maxdec = int(frac_ndec(arr).max())
+                formatspec = get_float_formatspec(maxdec, floatdecimal, bool(use_f_form(arr).all()))
 
-            # Number of decimal
-            maxdec = max(len(str(f-int(f)))-2 for f in lvals)
-            ndec = min(max(maxdec, floatdecimal), 10)
+        else:
+            lvals = flatten(values)
 
-            if all(f == 0 or (abs(f) > 1e-3 and abs(f) < 1e4) for f in lvals):
-                formatspec = '>{w}.{p}f'.format(w=ndec+5, p=ndec)
+            # Determine the representation
+            if all(isinstance(v, int) for v in lvals):
+                type_all = int
+            else:
+                try:
+                    for v in lvals:
+                        float(v)
+                    type_all = float
+                except Exception:
+                    type_all = str
+
+            # Determine the format
+            width = max(len(str(s)) for s in lvals)
+            if type_all == int:
+                formatspec = '>{0}d'.format(width)
+            elif type_all == str:
+                formatspec = '>{0}'.format(width)
             else:
-                formatspec = '>{w}.{p}e'.format(w=ndec+8, p=ndec)
+                # Number of decimal
+                maxdec = max(len(str(f-int(f)))-2 for f in lvals)
+                use_f = all(f == 0 or (abs(f) > 1e-3 and abs(f) < 1e4) for f in lvals)
+                formatspec = get_float_formatspec(maxdec, floatdecimal, use_f)
 
-        line = '\n'
-        for L in values:
-            for val in L:
-                line += ' {v:{f}}'.format(v=val, f=formatspec)
-            line += '\n'
+        rows = (''.join(' ' + format(val, formatspec) for val in L) for L in values)
 
-        return line.rstrip('\n')
+        return ('\n' + '\n'.join(rows)).rstrip('\n')
 
     def format_list(self, values: list, floatdecimal=0) -> str:
         """
         Format a list of values into a string.
         The result might be spread among several lines.
         """
-        line = ''
+        # Homogeneous numerical lists are formatted in a single pass with numpy.
+        tokens = format_floats(values, floatdecimal)
+        if tokens is None:
+            tokens = [self.format_scalar(val, floatdecimal) for val in values]
 
         # Format the line declaring the value
-        for i, val in enumerate(values):
-            line += ' ' + self.format_scalar(val, floatdecimal)
-            if self.valperline is not None and (i+1) % self.valperline == 0:
-                line += '\n'
+        step = self.valperline if self.valperline is not None else max(len(tokens), 1)
+        line = '\n'.join(''.join(' ' + tok for tok in tokens[i:i+step])
+                         for i in range(0, len(tokens), step))
 
         # Add a carriage return in case of several lines
-        if '\n' in line.rstrip('\n'):
+        if '\n' in line:
             line = '\n' + line
 
         return line.rstrip('\n')
 
 
+def format_floats(values, floatdecimal=0) -> list[str] | None:
+    """
+    Vectorized version of `InputVariable.format_scalar` for a list of numbers.
+    Return None if values cannot be handled in a single pass e.g. strings, mixed types
+    or integers that should be printed as they are because floatdecimal == 0.
+    """
+    if floatdecimal == 0:
+        if not all(isinstance(v, (float, np.floating)) for v in values):
+            return None
+    elif not all(isinstance(v, (int, float, np.integer, np.floating)) for v in values):
+        return None
+
+    try:
+        fvals = np.asarray(values, dtype=float)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+    if fvals.ndim != 1 or not np.all(np.isfinite(fvals)):
+        return None
+
+    ndec = np.maximum(frac_ndec(fvals), floatdecimal)
+    if floatdecimal <= 16:
+        ndec = np.minimum(ndec, 10)
+
+    use_f = use_f_form(fvals)
+    width = ndec + np.where(use_f, 5, 8)
+
+    fmts = np.char.add(np.char.add('%', width.astype(str)), np.char.add('.', ndec.astype(str)))
+    fmts = np.char.add(fmts, np.where(use_f, 'f', 'e'))
+
+    return np.char.replace(np.char.mod(fmts, fvals), 'e', 'd').tolist()
+
+
+def frac_ndec(arr: np.ndarray) -> np.ndarray:
+    """
+    Number of decimals in the repr of the fractional part of each entry of arr.
+    Vectorized version of `len(str(f - int(f))) - 2`.
+    """
+    if arr.dtype.kind in 'iub':
+        return np.full(arr.shape, -1)
+
+    # f - int(f) is f itself when |f| < 1 so the sign of -0.0 must be preserved
+    # (str(-0.0) has one more character). Use arr directly instead of arr - trunc(arr) = +0.0.
+    trunc = np.trunc(arr)
+    frac = np.where(trunc == 0, arr, arr - trunc)
+    return np.char.str_len(frac.astype(str)) - 2
+
+
+def use_f_form(arr: np.ndarray) -> np.ndarray:
+    """
+    Boolean mask with the entries of arr that can be printed in `f` format.
+    The others require the exponential notation.
+    """
+    absvals = np.abs(arr)
+    return (arr == 0) | ((absvals > 1e-3) & (absvals < 1e4))
+
+
+def get_float_formatspec(maxdec: int, floatdecimal: int, use_f: bool) -> str:
+    """
+    Return the format specifier for a table of floats with at most `maxdec` decimals.
+    """
+    ndec = min(max(maxdec, floatdecimal), 10)
+
+    if use_f:
+        return '>{w}.{p}f'.format(w=ndec+5, p=ndec)
+    else:
+        return '>{w}.{p}e'.format(w=ndec+8, p=ndec)
+
+
 def is_iter(obj: Any) -> bool:
     """Return True if the argument is list-like."""
-    return hasattr(obj, '__iter__')
+    return isinstance(obj, (list, tuple, np.ndarray))
 
 
 def flatten(iterable):
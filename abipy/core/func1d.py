@@ -21,6 +21,14 @@ __all__ = [
 ]
 
 
+def _coerce(other):
+    """
+    Prepare other for arithmetic with a numpy array.
+    Scalars are returned as they are and array-like objects are converted without copying.
+    """
+    return other if np.isscalar(other) else np.asarray(other)
+
+
 class Function1D:
     """
     Immutable object representing a real|complex function of real variable.
@@ -30,18 +38,29 @@ class Function1D:
     def from_constant(cls, mesh, const) -> Function1D:
         """Build a constant function from the mesh and the scalar ``const``"""
         mesh = np.ascontiguousarray(mesh)
-        return cls(mesh, np.ones(mesh.shape) * const)
+        return cls(mesh, np.full(mesh.shape, const, dtype=np.result_type(np.float64, const)))
 
     @classmethod
     def from_func(cls, func, mesh) -> Function1D:
         """
         Initialize the object from a callable.
+        func should be a ufunc-compatible callable (e.g. np.sin) that is applied to the whole mesh.
+        Callables that accept only scalars are supported as well but they are
+        evaluated point by point.
 
         :example:
 
            Function1D.from_func(np.sin, mesh=np.arange(1,10))
         """
-        return cls(mesh, np.vectorize(func)(mesh))
+        mesh = np.ascontiguousarray(mesh)
+        try:
+            values = np.asarray(func(mesh))
+            if values.shape != mesh.shape:
+                raise ValueError("func(mesh) returned shape %s instead of %s" % (values.shape, mesh.shape))
+        except Exception:
+            values = np.array([func(x) for x in mesh])
+
+        return cls(mesh, values)
 
     @pmg_serialize
     def as_dict(self) -> dict:
@@ -59,7 +78,8 @@ class Function1D:
     def from_file(cls, path, comments="#", delimiter=None, usecols=(0, 1)) -> Function1D:
         """
         Initialize an instance by reading data from path (txt format)
-        see also :func:`np.loadtxt`
+        see also :func:`np.loadtxt`. Files with the `.npz` extension are delegated to `from_npz`.
+        The binary format is much faster for large meshes and should be preferred.
 
         Args:
             path: Path to the file containing data.
@@ -68,10 +88,21 @@ class Function1D:
             usecols: sequence, optional. Which columns to read, with 0 being the first.
                 For example, usecols = (1,4) will extract data from the 2nd, and 5th columns.
         """
+        if str(path).endswith(".npz"):
+            return cls.from_npz(path)
+
         mesh, values = np.loadtxt(path, comments=comments, delimiter=delimiter,
                                   usecols=usecols, unpack=True)
         return cls(mesh, values)
 
+    @classmethod
+    def from_npz(cls, path) -> Function1D:
+        """
+        Initialize an instance from a npz file produced by `to_npz`.
+        """
+        with np.load(path) as data:
+            return cls(data["mesh"], data["values"])
+
 
     def __init__(self, mesh, values):
         """
@@ -84,6 +115,9 @@ class Function1D:
         self._values = np.ascontiguousarray(values)
         assert len(self.mesh) == len(self.values)
 
+        # Used in most of the algebraic operations so we compute it once.
+        self._iscomplexobj = np.iscomplexobj(self._values)
+
     @property
     def mesh(self) -> np.ndarray:
         """|numpy-array| with the mesh points"""
@@ -126,7 +160,7 @@ class Function1D:
             assert self.has_same_mesh(other)
             return cls(self.mesh, self.values+other.values)
         else:
-            return cls(self.mesh, self.values + np.array(other))
+            return cls(self.mesh, self.values + _coerce(other))
 
     __radd__ = __add__
 
@@ -136,7 +170,7 @@ class Function1D:
             assert self.has_same_mesh(other)
             return cls(self.mesh, self.values-other.values)
         else:
-            return cls(self.mesh, self.values-np.array(other))
+            return cls(self.mesh, self.values - _coerce(other))
 
     def __rsub__(self, other) -> Function1D:
         return -self + other
@@ -147,7 +181,7 @@ class Function1D:
             assert self.has_same_mesh(other)
             return cls(self.mesh, self.values*other.values)
         else:
-            return cls(self.mesh, self.values*other)
+            return cls(self.mesh, self.values * _coerce(other))
 
     __rmul__ = __mul__
 
@@ -157,7 +191,7 @@ class Function1D:
             assert self.has_same_mesh(other)
             return cls(self.mesh, self.values/other.values)
         else:
-            return cls(self.mesh, self.values/other)
+            return cls(self.mesh, self.values / _coerce(other))
 
     __rtruediv__ = __truediv__
 
@@ -176,11 +210,11 @@ class Function1D:
     @property
     def imag(self) -> Function1D:
         """Return new :class:`Function1D` with the imaginary part of self."""
-        return self.__class__(self.mesh, self.values.real)
+        return self.__class__(self.mesh, np.ascontiguousarray(self.values.imag))
 
     def conjugate(self) -> Function1D:
         """Return new :class:`Function1D` with the complex conjugate."""
-        return self.__class__(self.mesh, self.values.conjugate)
+        return self.__class__(self.mesh, self.values.conj())
 
     def abs(self) -> Function1D:
         """Return :class:`Function1D` with the absolute value."""
@@ -190,29 +224,36 @@ class Function1D:
         """
         Save data in a text file. Use format fmr. A header is added at the beginning.
         """
-        fmt = "%s %s\n" % (fmt, fmt)
         with open(path, "wt") as fh:
             if header: fh.write(header)
-            for x, y in zip(self.mesh, self.values):
-                fh.write(fmt % (x, y))
+            np.savetxt(fh, np.column_stack((self.mesh, self.values)), fmt="%s %s" % (fmt, fmt))
+
+    def to_npz(self, path) -> None:
+        """
+        Save mesh and values in binary npz format. Note that numpy adds the `.npz` extension if not present.
+        """
+        np.savez(path, mesh=self.mesh, values=self.values)
 
     def __repr__(self) -> str:
         return "%s at %s, size = %d" % (self.__class__.__name__, id(self), len(self))
 
     def __str__(self) -> str:
         stream = StringIO()
-        for x, y in zip(self.mesh, self.values):
-            stream.write("%.18e %.18e\n" % (x, y))
-        return "".join(stream.getvalue())
+        np.savetxt(stream, np.column_stack((self.mesh, self.values)), fmt="%.18e %.18e")
+        return stream.getvalue()
 
     def has_same_mesh(self, other: Function1D) -> bool:
         """True if self and other have the same mesh."""
+        # Functions obtained with algebraic operations share the same array.
+        if self.mesh is other.mesh: return True
+        if len(self.mesh) != len(other.mesh): return False
+
         if self.h is None and other.h is None:
             # Generic meshes.
             return np.allclose(self.mesh, other.mesh)
         else:
             # Check for linear meshes
-            return len(self.mesh) == len(other.mesh) and self.h == other.h
+            return self.h == other.h and self.mesh[0] == other.mesh[0]
 
     @property
     def bma(self) -> float:
@@ -226,7 +267,7 @@ class Function1D:
             return self.values.max()
         else:
             # Max of |z|
-            return np.max(np.abs(self.values))
+            return np.abs(self.values).max()
 
     @property
     def min(self) -> float:
@@ -234,7 +275,8 @@ class Function1D:
         if not self.iscomplexobj:
             return self.values.min()
         else:
-            return np.max(np.abs(self.values))
+            # Min of |z|
+            return np.abs(self.values).min()
 
     @property
     def iscomplexobj(self) -> bool:
@@ -243,12 +285,13 @@ class Function1D:
         The type of the input is checked, not the value. Even if the input
         has an imaginary part equal to zero, `np.iscomplexobj` evaluates to True.
         """
-        return np.iscomplexobj(self.values)
+        return self._iscomplexobj
 
     @lazy_property
     def h(self) -> Union[float, None]:
         """The spacing of the mesh. None if mesh is not homogeneous."""
-        return self.dx[0] if np.allclose(self.dx[0], self.dx) else None
+        dx = self.dx
+        return float(dx[0]) if dx.size and np.allclose(dx[0], dx) else None
 
     @lazy_property
     def dx(self) -> np.ndarray:
@@ -256,20 +299,15 @@ class Function1D:
         |numpy-array| of len(self) - 1 elements giving the distance between two
         consecutive points of the mesh, i.e. dx[i] = ||x[i+1] - x[i]||.
         """
-        dx = np.zeros(len(self)-1)
-        for (i, x) in enumerate(self.mesh[:-1]):
-            dx[i] = self.mesh[i+1] - x
-        return dx
+        return np.diff(self.mesh)
 
     def find_mesh_index(self, value) -> int:
         """
         Return the index of the first point in the mesh whose value is >= value
-        -1 if not found
+        -1 if not found. Assume mesh sorted in ascending order.
         """
-        for i, x in enumerate(self.mesh):
-            if x >= value:
-                return i
-        return -1
+        idx = int(np.searchsorted(self.mesh, value, side="left"))
+        return idx if idx < len(self.mesh) else -1
 
     def finite_diff(self, order: int = 1, acc: int = 4) -> Function1D:
         """
@@ -336,42 +374,51 @@ class Function1D:
         b = self.mesh[-1] if b is None else b
         return self.spline.integral(a, b)
 
+    def _trapezoid(self, values):
+        """Integrate values on the mesh with the composite trapezoidal rule."""
+        try:
+            from scipy.integrate import trapezoid
+        except ImportError:
+            from scipy.integrate import trapz as trapezoid
+
+        return trapezoid(values, x=self.mesh)
+
     @lazy_property
     def integral_value(self):
         r"""Compute :math:`\int f(x) dx`."""
-        return self.integral()[-1][1]
+        return self._trapezoid(self.values)
 
     @lazy_property
     def l1_norm(self) -> float:
         r"""Compute :math:`\int |f(x)| dx`."""
-        return abs(self).integral()[-1][1]
+        return float(self._trapezoid(np.abs(self.values)))
 
     @lazy_property
     def l2_norm(self) -> float:
         r"""Compute :math:`\sqrt{\int |f(x)|^2 dx}`."""
-        return np.sqrt((abs(self)**2).integral()[-1][1])
+        return float(np.sqrt(self._trapezoid(np.abs(self.values)**2)))
 
     def fft(self) -> Function1D:
         """Compute the FFT transform (negative sign)."""
         # Compute FFT and frequencies.
-        from scipy import fftpack
+        from scipy import fft as spfft
         n, d = len(self), self.h
-        fft_vals = fftpack.fft(self.values, n=n)
-        freqs = fftpack.fftfreq(n, d=d)
+        fft_vals = spfft.fft(self.values, n=n, workers=-1)
+        freqs = spfft.fftfreq(n, d=d)
 
         # Shift the zero-frequency component to the center of the spectrum.
-        fft_vals = fftpack.fftshift(fft_vals)
-        freqs = fftpack.fftshift(freqs)
+        fft_vals = spfft.fftshift(fft_vals)
+        freqs = spfft.fftshift(freqs)
 
         return self.__class__(freqs, fft_vals)
 
     def ifft(self, x0=None) -> Function1D:
         r"""Compute the FFT transform :math:`\int e+i`"""
         # Rearrange values in the standard order then perform IFFT.
-        from scipy import fftpack
+        from scipy import fft as spfft
         n, d = len(self), self.h
-        fft_vals = fftpack.ifftshift(self.values)
-        fft_vals = fftpack.ifft(fft_vals, n=n)
+        fft_vals = spfft.ifftshift(self.values)
+        fft_vals = spfft.ifft(fft_vals, n=n, workers=-1)
 
         # Compute the mesh of the IFFT output.
         x0 = 0.0 if x0 is None else x0
@@ -404,7 +451,7 @@ class Function1D:
     #    smooth_vals = smooth(self.values, window_len=window_len, window=window)
     #    return self.__class__(self.mesh, smooth_vals)
 
-    #def real_from_kk(self, with_div=True):
+    #def real_from_kk(self, with_div=True, block=256):
     #    """
     #    Compute the Kramers-Kronig transform of the imaginary part
     #    to get the real part. Assume self represents the Fourier
@@ -414,10 +461,11 @@ class Function1D:
     #        with_div: True if the divergence should be treated numerically.
     #            If False, the divergence is ignored, results are less accurate
     #            but the calculation is faster.
+    #        block: Number of rows of the KK kernel computed at once.
 
     #    .. seealso:: <https://en.wikipedia.org/wiki/Kramers%E2%80%93Kronig_relations>
     #    """
-    #    from scipy.integrate import cumtrapz, quad
+    #    from scipy.integrate import quad
     #    from scipy.interpolate import UnivariateSpline
     #    wmesh = self.mesh
     #    num = np.array(self.values.imag * wmesh, dtype=np.double)
@@ -425,17 +473,26 @@ class Function1D:
     #    if with_div:
     #        spline = UnivariateSpline(self.mesh, num, s=0)
 
+    #    # Trapezoidal weights so that the integral of each row becomes a matrix-vector product.
+    #    tw = np.zeros(len(self))
+    #    tw[:-1] += 0.5 * self.dx
+    #    tw[1:] += 0.5 * self.dx
+    #    w2 = wmesh**2
+
+    #    # Process rows in blocks so that the (block, n) matrix stays in cache.
     #    kk_values = np.empty(len(self))
-    #    for i, w in enumerate(wmesh):
-    #        den = wmesh**2 - w**2
+    #    for i0 in range(0, len(self), block):
+    #        i1 = min(i0 + block, len(self))
+    #        rows = np.arange(i1 - i0)
+    #        den = w2[None, :] - w2[i0:i1, None]
     #        # Singularity is treated below.
-    #        den[i] = 1
-    #        f = num / den
-    #        f[i] = 0
-    #        integ = cumtrapz(f, x=wmesh)
-    #        kk_values[i] = integ[-1]
+    #        den[rows, rows + i0] = 1
+    #        f = num[None, :] / den
+    #        f[rows, rows + i0] = 0
+    #        kk_values[i0:i1] = f @ tw
 
-    #        if with_div:
+    #    if with_div:
+    #        for i, w in enumerate(wmesh):
     #            func = lambda x: spline(x) / (x**2 - w**2)
     #            w0 = w - self.h
     #            w1 = w + self.h
@@ -444,7 +501,7 @@ class Function1D:
 
     #    return self.__class__(self.mesh, (2 / np.pi) * kk_values)
 
-    #def imag_from_kk(self, with_div=True):
+    #def imag_from_kk(self, with_div=True, block=256):
     #    """
     #    Compute the Kramers-Kronig transform of the real part
     #    to get the imaginary part. Assume self represents the Fourier
@@ -454,10 +511,11 @@ class Function1D:
     #        with_div: True if the divergence should be treated numerically.
     #            If False, the divergence is ignored, results are less accurate
     #            but the calculation is faster.
+    #        block: Number of rows of the KK kernel computed at once.
 
     #    .. seealso:: <https://en.wikipedia.org/wiki/Kramers%E2%80%93Kronig_relations>
     #    """
-    #    from scipy.integrate import cumtrapz, quad
+    #    from scipy.integrate import quad
     #    from scipy.interpolate import UnivariateSpline
     #    wmesh = self.mesh
     #    num = np.array(self.values.real, dtype=np.double)
@@ -465,17 +523,26 @@ class Function1D:
     #    if with_div:
     #        spline = UnivariateSpline(self.mesh, num, s=0)
 
+    #    # Trapezoidal weights so that the integral of each row becomes a matrix-vector product.
+    #    tw = np.zeros(len(self))
+    #    tw[:-1] += 0.5 * self.dx
+    #    tw[1:] += 0.5 * self.dx
+    #    w2 = wmesh**2
+
+    #    # Process rows in blocks so that the (block, n) matrix stays in cache.
     #    kk_values = np.empty(len(self))
-    #    for i, w in enumerate(wmesh):
-    #        den = wmesh**2 - w**2
+    #    for i0 in range(0, len(self), block):
+    #        i1 = min(i0 + block, len(self))
+    #        rows = np.arange(i1 - i0)
+    #        den = w2[None, :] - w2[i0:i1, None]
     #        # Singularity is treated below.
-    #        den[i] = 1
-    #        f = num / den
-    #        f[i] = 0
-    #        integ = cumtrapz(f, x=wmesh)
-    #        kk_values[i] = integ[-1]
+    #        den[rows, rows + i0] = 1
+    #        f = num[None, :] / den
+    #        f[rows, rows + i0] = 0
+    #        kk_values[i0:i1] = f @ tw
 
-    #        if with_div:
+    #    if with_div:
+    #        for i, w in enumerate(wmesh):
     #            func = lambda x: spline(x) / (x**2 - w**2)
     #            w0 = w - self.h
     #            w1 = w + self.h
@@ -514,10 +581,12 @@ class Function1D:
         else:
             cplx_mode = kwargs.pop("cplx_mode", "re")
 
+        # data_from_cplx_mode returns views for re and im so only abs and angle require a new array.
+        mesh = self.mesh if xfactor == 1 else self.mesh * xfactor
+
         lines = []
         for c in cplx_mode.lower().split("-"):
-            xx, yy = self.mesh, data_from_cplx_mode(c, self.values)
-            if xfactor != 1: xx = xx * xfactor
+            xx, yy = mesh, data_from_cplx_mode(c, self.values)
             if yfactor != 1: yy = yy * yfactor
             if normalize: yy = yy / np.max(yy)
 
@@ -588,9 +657,10 @@ class Function1D:
         if "name" in kwargs: showlegend = True
         showlegend = kwargs.pop("showlegend", showlegend)
 
+        mesh = self.mesh if xfactor == 1 else self.mesh * xfactor
+
         for c in cplx_mode.lower().split("-"):
-            xx, yy = self.mesh, data_from_cplx_mode(c, self.values)
-            if xfactor != 1: xx = xx * xfactor
+            xx, yy = mesh, data_from_cplx_mode(c, self.values)
             if yfactor != 1: yy = yy * yfactor
 
             if exchange_xy:
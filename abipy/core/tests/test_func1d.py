@@ -40,6 +40,11 @@ class TestFunction1D(AbipyTest):
         newcosf = Function1D.from_file(path)
         assert cosf == newcosf
 
+        path = self.get_tmpname(suffix=".npz")
+        self.eix.to_npz(path)
+        neweix = Function1D.from_file(path)
+        assert neweix == self.eix and neweix.iscomplexobj
+
         assert cosf == cosf
         assert not cosf == sinf
         assert cosf.has_same_mesh(sinf)
@@ -76,6 +81,10 @@ class TestFunction1D(AbipyTest):
         self.assert_almost_equal(abs(sinf).min, 0)
         self.assert_almost_equal(eix.max, 1.)
         self.assert_almost_equal(eix.min, 1.)
+        assert eix.real == cosf
+        assert eix.imag == sinf
+        assert eix.conjugate() == cosf - 1j * sinf
+        self.assert_almost_equal((eix * 1j + 2).min, 1., decimal=4)
 
         # Convolution
         #sg = sinf.gaussian_convolution(0.01)
@@ -110,3 +119,16 @@ class TestFunction1D(AbipyTest):
         same_sinf = sinf.fft().ifft()
         self.assert_almost_equal(same_sinf.values, sinf.values)
         self.assert_almost_equal(same_sinf.mesh, sinf.mesh)
+
+    def test_find_mesh_index(self):
+        """Test find_mesh_index."""
+        f = Function1D(np.array([0., 1., 2., 3.]), np.zeros(4))
+        assert [f.find_mesh_index(v) for v in (-1, 0, 0.5, 1, 3, 3.1)] == [0, 0, 1, 1, 3, -1]
+
+    def test_has_same_mesh(self):
+        """Test has_same_mesh and __eq__ with different meshes."""
+        sinf = self.sinf
+        assert sinf.has_same_mesh(2 * sinf)
+        assert not sinf.has_same_mesh(Function1D(sinf.mesh[:-1], sinf.values[:-1]))
+        assert not sinf == Function1D(sinf.mesh[:-1], sinf.values[:-1])
+        assert not sinf.has_same_mesh(Function1D(sinf.mesh + 1, sinf.values))
@@ -0,0 +1,23 @@
+"""Tests for core.release"""
+import subprocess
+import sys
+
+from abipy.core.testing import AbipyTest
+
+
+class TestRelease(AbipyTest):
+
+    def test_lazy_metadata(self):
+        """import abipy should not build the packaging metadata."""
+        code = ("import abipy, abipy.core.release as release; "
+                "assert 'authors' not in vars(release); "
+                "assert '__author__' not in vars(abipy); "
+                "assert 'M. Giantomassi' in abipy.__author__; "
+                "assert 'authors' in vars(release)")
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+        import abipy.core.release as release
+        assert release.authors["Matteo"][0] == "M. Giantomassi"
+        assert "classifiers" in dir(release)
+        with self.assertRaises(AttributeError):
+            release.foobar
@@ -8,7 +8,7 @@ import abipy.core.abinit_units as abu
 import scipy.constants as const
 import pandas as pd
 
-from functools import lru_cache
+from functools import lru_cache, wraps
 from collections import OrderedDict
 from monty.string import marquee, list_strings
 from monty.termcolor import cprint
@@ -19,7 +19,7 @@ from pymatgen.core.periodic_table import Element
 from abipy.core.kpoints import Kpath, IrredZone, KSamplingInfo
 from abipy.core.mixins import AbinitNcFile, Has_Structure, NotebookWriter
 from abipy.abio.inputs import AnaddbInput
-from abipy.dfpt.phonons import PhononBands, PhononBandsPlotter, PhononDos, match_eigenvectors, get_dyn_mat_eigenvec
+from abipy.dfpt.phonons import PhononBands, PhononBandsPlotter, PhononDos, get_dyn_mat_eigenvec
 from abipy.dfpt.ddb import DdbFile
 from abipy.iotools import ETSF_Reader
 from abipy.core.structure import Structure
@@ -39,6 +39,25 @@ _ALL_DOS_NAMES = OrderedDict([
 ])
 
 
+def _cache_by_match_eigv(method):
+    """
+    Decorator caching the result of a method whose only argument is ``match_eigv``.
+    The results are stored in the instance so that, contrary to lru_cache,
+    the object is not kept alive by a module-level cache.
+    """
+    attr = "_cache_" + method.__name__
+
+    @wraps(method)
+    def wrapper(self, match_eigv=True):
+        cache = self.__dict__.setdefault(attr, {})
+        key = bool(match_eigv)
+        if key not in cache:
+            cache[key] = method(self, match_eigv=key)
+        return cache[key]
+
+    return wrapper
+
+
 class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
     """
     This object provides an interface to the ``GRUNS.nc`` file produced by abinit.
@@ -119,6 +138,32 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         else:
             return w * abu.Ha_eV
 
+    @lazy_property
+    def wvols_qibz_iv0(self):
+        """Phonon frequencies in eV on the regular grid for the central volume V0."""
+        return self.wvols_qibz[:, self.iv0, :]
+
+    @lazy_property
+    def dwdq_qibz(self):
+        """
+        Derivatives of the phonon frequencies wrt q on the regular grid. Shape: (nqibz, natom3, 3)
+        Atomic units as stored in the GRUNS.nc file (not converted to eV, unlike the frequencies).
+        """
+        return self.reader.read_value("gruns_dwdq_qibz")
+
+    @lazy_property
+    def dwdq_qpath(self):
+        """
+        Derivatives of the phonon frequencies wrt q along the q-path. Shape: (nqpath, natom3, 3)
+        Atomic units as stored in the GRUNS.nc file (not converted to eV, unlike the frequencies).
+        """
+        return self.reader.read_value("gruns_dwdq_qpath")
+
+    @lazy_property
+    def groupv_qibz(self):
+        """Modulus of the phonon group velocities on the regular grid in atomic units. Shape: (nqibz, natom3)"""
+        return _speed(self.dwdq_qibz)
+
     @lazy_property
     def qibz(self):
         """q-points in the irreducible brillouin zone"""
@@ -158,12 +203,19 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         """Number of volumes"""
         return len(self.structures)
 
+    @lazy_property
+    def atomic_masses_amu(self) -> np.ndarray:
+        """Atomic masses in amu of the atom types as read from file. Shape: (ntypat,)"""
+        return np.asarray(self.reader.read_value("atomic_mass_units"), dtype=np.float64)
+
     @lazy_property
     def amu_symbol(self) -> dict:
         """Atomic mass units"""
-        amu_list = self.reader.read_value("atomic_mass_units")
+        amu_list = self.atomic_masses_amu
         atomic_numbers = self.reader.read_value("atomic_numbers")
-        amu = {Element.from_Z(at).symbol: a for at, a in zip(atomic_numbers, amu_list)}
+        # Call Element.from_Z only once per distinct atomic number.
+        uniq_z, first = np.unique(atomic_numbers, return_index=True)
+        amu = {Element.from_Z(int(z)).symbol: amu_list[i] for z, i in zip(uniq_z, first)}
         return amu
 
     def to_dataframe(self) -> pd.DataFrame:
@@ -180,30 +232,25 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         qidx            q-point index.
         mode            phonon branch index.
         grun            Gruneisen parameter.
-        groupv          Group velocity.
+        groupv          Group velocity in atomic units.
         freq            Phonon frequency in eV.
         ==============  ==========================
         """
         grun_vals = self.gvals_qibz
         nqibz, natom3 = grun_vals.shape
-        phfreqs = self.reader.rootgrp.variables["gruns_wvols_qibz"][:, self.iv0, :] * abu.Ha_eV
-        # TODO: units?
-        dwdq = self.reader.read_value("gruns_dwdq_qibz")
-        groupv = np.linalg.norm(dwdq, axis=-1)
-
-        rows = []
-        for iq in range(nqibz):
-            for nu in range(natom3):
-                rows.append(OrderedDict([
-                           ("qidx", iq),
-                           ("mode", nu),
-                           ("grun", grun_vals[iq, nu]),
-                           ("groupv", groupv[iq, nu]),
-                           ("freq", phfreqs[iq, nu]),
-                           #("qpoint", self.qpoints[iq]),
-                        ]))
-
-        return pd.DataFrame(rows, columns=list(rows[0].keys()))
+        phfreqs = self.wvols_qibz_iv0
+        groupv = self.groupv_qibz
+
+        # Build the columns directly from the (nqibz, natom3) arrays in C order.
+        # copy=False lets the float columns alias the raveled numpy buffers.
+        return pd.DataFrame({
+            "qidx": np.repeat(np.arange(nqibz, dtype=np.int32), natom3),
+            "mode": np.tile(np.arange(natom3, dtype=np.int32), nqibz),
+            "grun": np.ravel(grun_vals),
+            "groupv": np.ravel(groupv),
+            "freq": np.ravel(phfreqs),
+            #"qpoint": self.qpoints[iq],
+        }, copy=False)
 
     @add_fig_kwargs
     def plot_phdoses(self, xlims=None, dos_names="all", with_idos=True, **kwargs) -> Figure:
@@ -221,7 +268,8 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         if not self.phdoses: return None
 
         dos_names = _ALL_DOS_NAMES.keys() if dos_names == "all" else list_strings(dos_names)
-        wmesh = self.phdoses["wmesh"]
+        phdoses = self.phdoses
+        wmesh = phdoses["wmesh"]
 
         nrows, ncols = len(dos_names), 1
         ax_list, fig, plt = get_axarray_fig_plt(None, nrows=nrows, ncols=ncols,
@@ -229,7 +277,7 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         ax_list = ax_list.ravel()
 
         for i, (name, ax) in enumerate(zip(dos_names, ax_list)):
-            dos, idos = self.phdoses[name][0], self.phdoses[name][1]
+            dos, idos = phdoses[name]
             ax.plot(wmesh, dos, color="k")
             ax.grid(True)
             set_axlims(ax, xlims, "x")
@@ -313,19 +361,18 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
             max_gamma = np.abs(phbands.grun_vals).max()
             values = phbands.grun_vals
         elif fill_with == "groupv":
-            # TODO: units?
-            dwdq_qpath = self.reader.read_value("gruns_dwdq_qpath")
-            values = np.linalg.norm(dwdq_qpath, axis=-1)
+            values = _speed(self.dwdq_qpath)
             max_gamma = np.abs(values).max()
         elif fill_with == "gruns_fd":
-            max_gamma = np.abs(self.grun_vals_finite_differences(match_eigv=True)).max()
             values = self.grun_vals_finite_differences(match_eigv=True)
+            max_gamma = np.abs(values).max()
         else:
             raise ValueError(f"Unsupported {fill_with=}")
 
         # Plot gruneisen markers on top of band structure.
-        xvals = np.arange(len(phbands.phfreqs))
-        max_omega = np.abs(phbands.phfreqs).max()
+        phfreqs = phbands.phfreqs
+        xvals = np.arange(len(phfreqs))
+        max_omega = max(phfreqs.max(), -phfreqs.min())
 
         # Select the band range.
         if branch_range is None:
@@ -333,21 +380,30 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         else:
             branch_range = range(branch_range[0], branch_range[1], 1)
 
+        # Scale all the branches at once and only slice them inside the loop.
+        # Single precision is enough for the renderer.
+        omegas_all = (phfreqs * factor).astype(np.float32, copy=False)
+        values = np.asarray(values).astype(np.float32, copy=False)
+        scale_g = float(gamma_fact * max_omega / max_gamma)
+        if fill_with.startswith("gruns"):
+            # Must handle positive-negative values
+            sizes_all = values * (0.02 * scale_g)
+            yup_all = omegas_all + np.maximum(sizes_all, 0)
+            ydown_all = omegas_all + np.minimum(sizes_all, 0)
+        elif fill_with == "groupv":
+            sizes_all = values * (0.04 * scale_g)
+            yup_all = omegas_all + sizes_all / 2
+            ydown_all = omegas_all - sizes_all / 2
+
         for nu in branch_range:
-            omegas = phbands.phfreqs[:, nu].copy() * factor
+            omegas = omegas_all[:, nu]
 
             if fill_with.startswith("gruns"):
-                # Must handle positive-negative values
-                sizes = values[:, nu].copy() * (gamma_fact * 0.02 * max_omega / max_gamma)
-                yup = omegas + np.where(sizes >= 0, sizes, 0)
-                ydown = omegas + np.where(sizes < 0, sizes, 0)
-                ax_bands.fill_between(xvals, omegas, yup, alpha=alpha, facecolor="red")
-                ax_bands.fill_between(xvals, ydown, omegas, alpha=alpha, facecolor="blue")
+                ax_bands.fill_between(xvals, omegas, yup_all[:, nu], alpha=alpha, facecolor="red")
+                ax_bands.fill_between(xvals, ydown_all[:, nu], omegas, alpha=alpha, facecolor="blue")
 
             elif fill_with == "groupv":
-                sizes = values[:, nu].copy() * (gamma_fact * 0.04 * max_omega / max_gamma)
-                ydown, yup = omegas - sizes / 2, omegas + sizes / 2
-                ax_bands.fill_between(xvals, ydown, yup, alpha=alpha, facecolor="red")
+                ax_bands.fill_between(xvals, ydown_all[:, nu], yup_all[:, nu], alpha=alpha, facecolor="red")
 
         set_axlims(ax_bands, ylims, "y")
 
@@ -355,9 +411,10 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
             return fig
 
         # Plot PHDoses.
-        wmesh = self.phdoses["wmesh"] * factor
+        phdoses = self.phdoses
+        wmesh = phdoses["wmesh"] * factor
         for i, (name, ax) in enumerate(zip(dos_names, ax_phdoses)):
-            dos, idos = self.phdoses[name][0], self.phdoses[name][1]
+            dos, idos = phdoses[name]
             ax.plot(dos, wmesh, label=name, color="k")
             set_axlims(ax, ylims, "x")
             ax.grid(True)
@@ -392,14 +449,15 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         if values == "gruns":
             y = self.gvals_qibz
         elif values == "groupv":
-            # TODO: units?
-            y = np.linalg.norm(self.reader.read_value("gruns_dwdq_qibz"), axis=-1)
+            y = self.groupv_qibz
         elif values == "gruns_fd":
             y = self.gvals_qibz_finite_differences(match_eigv=True)
         else:
             raise ValueError(f"Unsupported {values=}")
 
-        w = self.wvols_qibz[:, self.iv0, :] * abu.phfactor_ev2units(units)
+        # Matplotlib renders in single precision so there's no point in passing doubles.
+        w = (self.wvols_qibz_iv0 * abu.phfactor_ev2units(units)).astype(np.float32, copy=False)
+        y = np.asarray(y).astype(np.float32, copy=False)
 
         ax, fig, plt = get_ax_fig_plt(ax=ax)
         ax.grid(True)
@@ -410,11 +468,10 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         if cmap is None:
             ax.scatter(w.flatten(), y.flatten(), **kwargs)
         else:
-            cmap = plt.get_cmap(cmap)
+            # A single scatter for all the branches, colored according to nu / natom3.
             natom3 = 3 * len(self.structure)
-            for nu in range(natom3):
-                color = cmap(float(nu) / natom3)
-                ax.scatter(w[:, nu], y[:, nu], color=color, **kwargs)
+            c = np.broadcast_to(np.arange(natom3) / natom3, w.shape)
+            ax.scatter(w.ravel(), y.ravel(), c=c.ravel(), cmap=plt.get_cmap(cmap), vmin=0, vmax=1, **kwargs)
 
         ax.set_xlabel('Frequency %s' % abu.phunit_tag(units))
 
@@ -431,10 +488,11 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         Splits the values of the gruneisen along a path like for the phonon bands
         """
         # trigger the generation of the split in the phbands
-        self.phbands_qpath_vol[self.iv0].split_phfreqs
+        phbands = self.phbands_qpath_vol[self.iv0]
+        phbands.split_phfreqs
 
-        indices = self.phbands_qpath_vol[self.iv0]._split_indices
-        g = self.phbands_qpath_vol[self.iv0].grun_vals
+        indices = phbands._split_indices
+        g = phbands.grun_vals
         return [np.array(g[indices[i]:indices[i + 1] + 1]) for i in range(len(indices) - 1)]
 
     @lazy_property
@@ -443,10 +501,11 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         Splits the values of the group velocities along a path like for the phonon bands
         """
         # trigger the generation of the split in the phbands
-        self.phbands_qpath_vol[self.iv0].split_phfreqs
+        phbands = self.phbands_qpath_vol[self.iv0]
+        phbands.split_phfreqs
 
-        indices = self.phbands_qpath_vol[self.iv0]._split_indices
-        v = self.reader.read_value("gruns_dwdq_qpath")
+        indices = phbands._split_indices
+        v = self.dwdq_qpath
         return [np.array(v[indices[i]:indices[i + 1] + 1]) for i in range(len(indices) - 1)]
 
     @add_fig_kwargs
@@ -475,7 +534,7 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
             y = self.split_gruns
         elif values == "groupv":
             # TODO: units?
-            y = np.linalg.norm(self.split_dwdq, axis=-1)
+            y = [_speed(v) for v in self.split_dwdq]
         elif values == "gruns_fd":
             y = self.split_gruns_finite_differences(match_eigv=True)
         else:
@@ -509,16 +568,26 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         if "color" not in kwargs:
             kwargs["color"] = "black"
 
+        # All the branches of all the segments are drawn with a single Line2D
+        # in which the curves are separated by NaNs.
+        branch_range = list(branch_range)
         first_xx = 0
+        all_xx, all_yy = [], []
 
         for i, yy in enumerate(y):
             if match_bands:
                 ind = phbands.split_matched_indices[i]
-                yy = yy[np.arange(len(yy))[:, None], ind]
-            xx = list(range(first_xx, first_xx + len(yy)))
-            for branch in branch_range:
-                ax.plot(xx, yy[:, branch], **kwargs)
-            first_xx = xx[-1]
+                yy = np.take_along_axis(yy, ind, axis=1)
+            npts = len(yy)
+            xx = np.arange(first_xx, first_xx + npts, dtype=float)
+            block = np.full((npts + 1, len(branch_range)), np.nan)
+            block[:-1] = yy[:, branch_range]
+            all_yy.append(block.ravel(order="F"))
+            all_xx.append(np.tile(np.append(xx, np.nan), len(branch_range)))
+            first_xx = first_xx + npts - 1
+
+        if all_xx:
+            ax.plot(np.concatenate(all_xx), np.concatenate(all_yy), **kwargs)
 
         return fig
 
@@ -590,30 +659,38 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         if t is None:
             t = self.acoustic_debye_temp
 
-        w = self.wvols_qibz[:,self.iv0,:]
-        wdkt = w / (abu.kb_eVK * t)
-
-        # if w=0 set cv=0
-        cv = np.choose(w > 0, (0, abu.kb_eVK * wdkt ** 2 * np.exp(wdkt) / (np.exp(wdkt) - 1) ** 2))
-
-        gamma = self.gvals_qibz
-
-        if squared:
-            gamma = gamma ** 2
+        w, gvals = self.wvols_qibz_iv0, self.gvals_qibz
 
+        # Modes entering the average. Imaginary modes (w <= 0) are always excluded.
+        mask = w > 0
         if limit_frequencies == "debye":
             adt = self.acoustic_debye_temp
-            ind = np.where((0 <= w) & (w <= adt * abu.kb_eVK))
+            mask &= w <= adt * abu.kb_eVK
         elif limit_frequencies == "acoustic":
-            w_acoustic = w[:, :3]
-            ind = np.where(w_acoustic >= 0)
-        elif limit_frequencies is None:
-            ind = np.where(w >= 0)
-        else:
+            w, gvals, mask = w[:, :3], gvals[:, :3], mask[:, :3]
+        elif limit_frequencies is not None:
             raise ValueError("{} is not an accepted value for limit_frequencies".format(limit_frequencies))
 
+        # cv = 0 for the excluded modes. Only the selected frequencies enter the computation.
+        # x^2 e^x / (e^x - 1)^2 is evaluated as (x / (2 sinh(x/2)))^2:
+        # one transcendental call and no overflow to inf/inf for large x.
+        cv = np.zeros_like(w)
+        wdkt = w[mask] / (abu.kb_eVK * t)
+        cv[mask] = abu.kb_eVK * (wdkt / (2 * np.sinh(wdkt / 2))) ** 2
+
+        # Imaginary modes may have ill-defined Gruneisen parameters (e.g. nan) and 0 * nan is nan,
+        # so gamma is masked as well to exclude these modes from both the numerator and the denominator.
+        gamma = np.where(mask, gvals, 0)
+
+        # Weighted sums over (q, nu) so that no fancy-indexed copy is needed.
         weights = self.phdoses['qpoints'].weights
-        g = np.dot(weights[ind[0]], np.multiply(cv, gamma)[ind]).sum() / np.dot(weights[ind[0]], cv[ind]).sum()
+        # In the squared case gamma enters twice so that gamma ** 2 is never materialized.
+        if squared:
+            num = np.einsum('q,qm,qm,qm->', weights, cv, gamma, gamma, optimize=True)
+        else:
+            num = np.einsum('q,qm,qm->', weights, cv, gamma, optimize=True)
+        den = np.einsum('q,qm->', weights, cv, optimize=True)
+        g = num / den
 
         if squared:
             g = np.sqrt(g)
@@ -640,7 +717,8 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
 
         Returns: The value of the thermal conductivity in W/(m*K)
         """
-        average_mass = np.mean([s.specie.atomic_mass for s in self.structure]) * amu_to_kg
+        # The composition weight is the sum of the atomic masses of all the sites.
+        average_mass = float(self.structure.composition.weight) / len(self.structure) * amu_to_kg
         if theta_d is None:
             theta_d = self.acoustic_debye_temp
         mean_g = self.average_gruneisen(t=theta_d, squared=squared, limit_frequencies=limit_frequencies)
@@ -712,13 +790,24 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         if len(ddb_list) % 2 != 1:
             raise ValueError("An odd number of ddb file paths should be provided")
 
-        ddbs = [DdbFile(d) for d in ddb_list]
+        if len(ddb_list) < 3:
+            ddbs = [DdbFile(d) for d in ddb_list]
+        else:
+            # Overlap the I/O of the different DDB files.
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(len(ddb_list), os.cpu_count() or 1)) as executor:
+                ddbs = list(executor.map(DdbFile, ddb_list))
         ddbs = sorted(ddbs, key=lambda d: d.structure.volume)
         iv0 = int((len(ddbs) - 1) / 2)
         ddb0 = ddbs[iv0]
         # update list of paths with absolute paths in the correct order
         ddb_list = [d.filepath for d in ddbs]
 
+        # Only the central DDB is needed from now on (anaddb reads the others from ddb_list).
+        for i, ddb in enumerate(ddbs):
+            if i != iv0: ddb.close()
+        del ddbs
+
         if ngqpt is None: ngqpt = ddb0.guessed_ngqpt
 
         if lo_to_splitting == "automatic":
@@ -750,7 +839,17 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
 
         return cls.from_file(os.path.join(task.workdir, "run.abo_GRUNS.nc"))
 
-    @lru_cache()
+    @lazy_property
+    def phfreqs_qpath_vols(self) -> np.ndarray:
+        """Phonon frequencies along the q-path for all the volumes. Shape: (nvols, nqpath, natom3)"""
+        return np.stack([b.phfreqs for b in self.phbands_qpath_vol])
+
+    @lazy_property
+    def eigvec_qpath_vols(self) -> np.ndarray:
+        """Dynamical matrix eigenvectors along the q-path for all the volumes. Shape: (nvols, nqpath, natom3, natom3)"""
+        return np.stack([b.dyn_mat_eigenvect for b in self.phbands_qpath_vol])
+
+    @_cache_by_match_eigv
     def grun_vals_finite_differences(self, match_eigv=True):
         """
         Gruneisen parameters along the high symmetry path calculated with finite differences.
@@ -758,33 +857,28 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
         if not self.phbands_qpath_vol:
             raise ValueError("Finite differences require the phonon bands")
 
-        phbands = np.array([b.phfreqs for b in self.phbands_qpath_vol])
-        if match_eigv:
-            eig = np.array([b.dyn_mat_eigenvect for b in self.phbands_qpath_vol])
-        else:
-            eig = None
+        phbands = self.phfreqs_qpath_vols
+        eig = self.eigvec_qpath_vols if match_eigv else None
 
         dv = np.abs(self.volumes[0] - self.volumes[1])
 
         return calculate_gruns_finite_differences(phbands, eig, self.iv0, self.structure.volume, dv)
 
-    @lru_cache()
+    @_cache_by_match_eigv
     def split_gruns_finite_differences(self, match_eigv=True):
         """
         Splits the values of the finite differences gruneisen along a path like for the phonon bands
         """
-        try:
-            return self._split_gruns_fd
-        except AttributeError:
-            # trigger the generation of the split in the phbands
-            self.phbands_qpath_vol[self.iv0].split_phfreqs
+        # The result is cached for each value of match_eigv.
+        # trigger the generation of the split in the phbands
+        phbands = self.phbands_qpath_vol[self.iv0]
+        phbands.split_phfreqs
 
-            indices = self.phbands_qpath_vol[self.iv0]._split_indices
-            g = self.grun_vals_finite_differences(match_eigv=match_eigv)
-            self._split_gruns_fd = [np.array(g[indices[i]:indices[i + 1] + 1]) for i in range(len(indices) - 1)]
-            return self._split_gruns_fd
+        indices = phbands._split_indices
+        g = self.grun_vals_finite_differences(match_eigv=match_eigv)
+        return [np.array(g[indices[i]:indices[i + 1] + 1]) for i in range(len(indices) - 1)]
 
-    @lru_cache()
+    @_cache_by_match_eigv
     def gvals_qibz_finite_differences(self, match_eigv=True):
         """
         Gruneisen parameters in the irreducible brillouin zone calculated with finite differences.
@@ -793,12 +887,17 @@ class GrunsNcFile(AbinitNcFile, Has_Structure, NotebookWriter):
             raise ValueError("Finite differences require wvols_qibz")
 
         if match_eigv:
-            eig = np.zeros_like(self.phdispl_cart_qibz)
-            for i in range(self.nvols):
-                eig[:, i] = get_dyn_mat_eigenvec(self.phdispl_cart_qibz[:, i], self.structures[i],
-                                                 amu_symbol=self.amu_symbol)
-
-            eig = eig.transpose((1, 0, 2, 3))
+            # The eigenvectors are needed with the volume axis first, as expected by calculate_gruns_finite_differences.
+            phdispl_cart = self.phdispl_cart_qibz.swapaxes(0, 1)
+            species = self.structure.species
+            if all(s.species == species for s in self.structures):
+                # The mass weighting only depends on the species of the sites so all the volumes
+                # can be converted with a single call. The output is allocated in the swapped layout.
+                eig = get_dyn_mat_eigenvec(phdispl_cart, self.structure, amu_symbol=self.amu_symbol)
+            else:
+                eig = np.empty(phdispl_cart.shape, dtype=phdispl_cart.dtype)
+                for i, structure in enumerate(self.structures):
+                    eig[i] = get_dyn_mat_eigenvec(phdispl_cart[i], structure, amu_symbol=self.amu_symbol)
         else:
             eig = None
 
@@ -848,6 +947,25 @@ class GrunsReader(ETSF_Reader):
         # The index of the volume used for the finite difference.
         self.iv0 = self.read_value("gruns_iv0") - 1  #  F --> C
 
+        # The default HDF5 chunk cache (1 MiB) is too small for the 4D arrays that are
+        # accessed with strided slices e.g. wvols_qibz[:, iv0, :]. NetCDF3 files are not chunked.
+        # nelems is the number of hash slots: a prime much larger than the number of chunks in the cache.
+        if self.rootgrp.data_model.startswith("NETCDF4"):
+            for vname in ("gruns_wvols_qibz", "gruns_gvals_qibz", "gruns_phdispl_cart_qibz"):
+                if vname in self.rootgrp.variables:
+                    self.rootgrp.variables[vname].set_var_chunk_cache(size=64 * 1024**2, nelems=1_000_003,
+                                                                      preemption=0.75)
+
+    @lazy_property
+    def rprimd_vols(self) -> np.ndarray:
+        """Lattice vectors in Angstrom at the different volumes. Shape: (nvols, 3, 3)"""
+        return self.read_value("gruns_rprimd") * abu.Bohr_Ang
+
+    @lazy_property
+    def xred_vols(self) -> np.ndarray:
+        """Reduced atomic positions at the different volumes. Shape: (nvols, natom, 3)"""
+        return self.read_value("gruns_xred")
+
     def read_phdoses(self) -> AttrDict:
         """
         Return a |AttrDict| with the PHDOSes available in the file. Empty dict if
@@ -872,7 +990,7 @@ class GrunsReader(ETSF_Reader):
 
         for dos_name in _ALL_DOS_NAMES:
             dos_idos = self.read_value(dos_name)
-            dos_idos[0] *= abu.eV_Ha  # Here we convert to eV. IDOS are not changed.
+            np.multiply(dos_idos[0], abu.eV_Ha, out=dos_idos[0])  # Here we convert to eV. IDOS are not changed.
             d[dos_name] = dos_idos
 
         return d
@@ -890,8 +1008,6 @@ class GrunsReader(ETSF_Reader):
         qfrac_coords = self.read_value("gruns_qpath")
         grun_vals = self.read_value("gruns_gvals_qpath")
         freqs_vol = self.read_value("gruns_wvols_qpath") * abu.Ha_eV
-        # TODO: Convert?
-        dwdq_qpath = self.read_value("gruns_dwdq_qpath")
 
         amuz = self.read_amuz_dict()
         #print("amuz", amuz)
@@ -900,10 +1016,13 @@ class GrunsReader(ETSF_Reader):
         # "two, number_of_phonon_modes, number_of_phonon_modes, gruns_nvols, gruns_nqpath") &
         # NOTE: in GRUNS the displacements are in Bohr. here we convert to Ang to be
         # consistent with the PhononBands API.
-        phdispl_cart_qptsvol = self.read_value("gruns_phdispl_cart_qpath", cmode="c") * abu.Bohr_Ang
-
-        lattices = self.read_value("gruns_rprimd") * abu.Bohr_Ang #, "dp", "three, three, gruns_nvols")
-        gruns_xred = self.read_value("gruns_xred")                #, "dp", "three, number_of_atoms, gruns_nvols")
+        # The unit conversion and the transposition to (nvols, nqpath, ...) are done in a single pass
+        # so that each volume gets a C-contiguous view of the displacements without further copies.
+        # The (real, imag) pairs are contiguous on the last axis so the complex array is just a view.
+        phdispl_cart_qptsvol = np.ascontiguousarray(self.read_value("gruns_phdispl_cart_qpath"),
+                                                    dtype=np.float64).view(np.complex128)[..., 0]
+        phdispl_cart_volqpts = np.multiply(phdispl_cart_qptsvol.swapaxes(0, 1), abu.Bohr_Ang, order="C")
+        del phdispl_cart_qptsvol
 
         structures = self.read_structures()
 
@@ -912,7 +1031,7 @@ class GrunsReader(ETSF_Reader):
             structure = structures[ivol]
             # TODO non_anal_ph
             qpoints = Kpath(structure.reciprocal_lattice, qfrac_coords)
-            phdispl_cart = phdispl_cart_qptsvol[:, ivol].copy()
+            phdispl_cart = phdispl_cart_volqpts[ivol]
             phb = PhononBands(structure, qpoints, freqs_vol[:, ivol], phdispl_cart, non_anal_ph=None, amu=amuz)
             # Add Grunesein parameters.
             if ivol == self.iv0: phb.grun_vals = grun_vals
@@ -928,10 +1047,11 @@ class GrunsReader(ETSF_Reader):
         amu_typat = self.read_value("atomic_mass_units")
         znucl_typat = self.read_value("atomic_numbers")
 
+        # Single pass over the atom types. If several types have the same atomic number,
+        # the first one wins as in typeidx_from_symbol.
         amuz = {}
-        for symbol in self.chemical_symbols:
-            type_idx = self.typeidx_from_symbol(symbol)
-            amuz[znucl_typat[type_idx]] = amu_typat[type_idx]
+        for znucl, amu in zip(znucl_typat, amu_typat):
+            amuz.setdefault(znucl, amu)
 
         return amuz
 
@@ -939,8 +1059,8 @@ class GrunsReader(ETSF_Reader):
         """
         Resturns a list of structures at the different volumes
         """
-        lattices = self.read_value("gruns_rprimd") * abu.Bohr_Ang  # , "dp", "three, three, gruns_nvols")
-        gruns_xred = self.read_value("gruns_xred")  # , "dp", "three, number_of_atoms, gruns_nvols")
+        lattices = self.rprimd_vols
+        gruns_xred = self.xred_vols
 
         structures = []
         for ivol in range(self.num_volumes):
@@ -952,6 +1072,13 @@ class GrunsReader(ETSF_Reader):
         return structures
 
 
+def _speed(dwdq: np.ndarray) -> np.ndarray:
+    """
+    Modulus of the group velocities, i.e. the norm of ``dwdq`` along the last (cartesian) axis.
+    """
+    return np.sqrt(np.einsum('...i,...i->...', dwdq, dwdq))
+
+
 def calculate_gruns_finite_differences(phfreqs, eig, iv0, volume, dv) -> np.ndarray:
     """
     Calculates the Gruneisen parameters from finite differences on the phonon frequencies.
@@ -968,30 +1095,106 @@ def calculate_gruns_finite_differences(phfreqs, eig, iv0, volume, dv) -> np.ndar
     Returns:
         A numpy array with the gruneisen parameters. Shape (nqpts, 3*natoms)
     """
-    phfreqs = phfreqs.copy()
+    phfreqs = np.asarray(phfreqs)
 
-    nvols = phfreqs.shape[0]
     if eig is not None:
+        # The input is not modified: the matched frequencies are gathered in a new buffer.
+        nvols, nqpts, nmodes = phfreqs.shape
+        matched = np.empty_like(phfreqs)
+        matched[iv0] = phfreqs[iv0]
+        qshift = nmodes * np.arange(nqpts)[:, None]
         for i in range(nvols):
             if i == iv0:
                 continue
-            for iq in range(phfreqs.shape[1]):
-                ind = match_eigenvectors(eig[iv0, iq], eig[i, iq])
-                phfreqs[i, iq] = phfreqs[i, iq][ind]
-
-    acc = nvols - 1
-    g = np.zeros_like(phfreqs[0])
-    for iq in range(phfreqs.shape[1]):
-        for im in range(phfreqs.shape[2]):
-            w = phfreqs[iv0, iq, im]
-            if w == 0:
-                g[iq, im] = 0
-            else:
-                g[iq, im] = - finite_diff(phfreqs[:, iq, im], dv, order=1, acc=acc)[iv0] * volume / w
+            ind = _match_eigenvectors_batch(eig[iv0], eig[i])
+            np.take(phfreqs[i], ind + qshift, out=matched[i])
+        phfreqs = matched
+
+    return _gruns_fd_kernel(phfreqs, iv0, volume, dv)
+
+
+def _match_eigenvectors_batch(eig_ref, eig_other, diag_tol=0.9) -> np.ndarray:
+    """
+    Same as match_eigenvectors but for all the q-points at once.
+    The overlaps and their ordering are computed with a single call and only the
+    greedy assignment is done q-point by q-point.
+    The q-points whose diagonal overlaps are all larger than ``diag_tol`` keep the identity
+    permutation: for orthonormal vectors this is what the greedy assignment would return anyway.
+
+    Args:
+        eig_ref: Reference eigenvectors. Shape (nqpts, nmodes, nmodes)
+        eig_other: Eigenvectors to be matched. Shape (nqpts, nmodes, nmodes)
+        diag_tol: Threshold on the squared modulus of the diagonal overlaps.
+
+    Returns:
+        Array of indices with shape (nqpts, nmodes).
+    """
+    nqpts, nmodes = eig_ref.shape[:2]
+    indices = np.broadcast_to(np.arange(nmodes), (nqpts, nmodes)).copy()
+
+    # O(nmodes^2) check of the diagonal before building the full overlap matrices.
+    diag = np.abs(np.einsum('qia,qia->qi', eig_ref, eig_other.conj(), optimize=True)) ** 2
+    iq_todo = np.flatnonzero(diag.min(axis=1) <= diag_tol)
+    if len(iq_todo) == 0:
+        return indices
+
+    prod = np.abs(np.einsum('qia,qja->qij', eig_ref[iq_todo], eig_other[iq_todo].conj(), optimize=True))
+    order = np.argsort(prod.reshape(len(iq_todo), -1), axis=1)[:, ::-1]
+
+    for k, iq in enumerate(iq_todo):
+        missing_ref = np.ones(nmodes, dtype=bool)
+        missing_other = np.ones(nmodes, dtype=bool)
+        nfound = 0
+        for m in order[k]:
+            i, j = divmod(m, nmodes)
+            if missing_ref[i] and missing_other[j]:
+                indices[iq, i] = j
+                missing_ref[i] = missing_other[j] = False
+                nfound += 1
+                if nfound == nmodes: break
+
+    return indices
+
+
+@lru_cache(maxsize=32)
+def _fd_weights(nvols, iv0) -> np.ndarray:
+    """
+    Weights w such that ``np.dot(w, f) / h`` is the first derivative of f at iv0 as computed by
+    ``finite_diff(f, h, order=1, acc=nvols - 1)``. Obtained by applying finite_diff to the unit vectors.
+    The array is cached and read-only.
+    """
+    weights = np.array([finite_diff(e, 1, order=1, acc=nvols - 1, index=iv0).value for e in np.eye(nvols)])
+    weights.flags.writeable = False
+    return weights
+
+
+def _gruns_fd_kernel(phfreqs, iv0, volume, dv) -> np.ndarray:
+    """
+    Gruneisen parameters from the (already matched) frequencies at the different volumes.
+    The derivative is a single contraction over the volume axis. Shape (nqpts, 3*natoms)
+    """
+    nvols = phfreqs.shape[0]
+    # Explicit central stencils for the common 3 and 5 volumes cases.
+    if nvols == 3 and iv0 == 1:
+        dw = (phfreqs[2] - phfreqs[0]) * (0.5 / dv)
+    elif nvols == 5 and iv0 == 2:
+        dw = (phfreqs[0] - phfreqs[4] + 8 * (phfreqs[3] - phfreqs[1])) * (1 / (12 * dv))
+    else:
+        coef = _fd_weights(nvols, iv0)
+        dw = np.tensordot(coef, phfreqs, axes=(0, 0)) / dv
+
+    # g = 0 if w == 0.
+    w = phfreqs[iv0]
+    g = np.zeros(w.shape)
+    np.divide(-volume * dw, w, out=g, where=w != 0)
 
     return g
 
 
+# Numerical prefactor of the Slack formula.
+_SLACK_PREFACTOR = 0.849 * 3 * (4 ** (1. / 3.)) / (20 * np.pi ** 3)
+
+
 def thermal_conductivity_slack(average_mass, volume, mean_g, theta_d, t=None) -> float:
     """
     Generic function for the calculation of the thermal conductivity at the acoustic Debye
@@ -1006,16 +1209,19 @@ def thermal_conductivity_slack(average_mass, volume, mean_g, theta_d, t=None) ->
         theta_d: the Debye temperature in the Slack formula.
         t: temperature at which the thermal conductivity is estimated. If None theta_d is used.
             The value is obtained as a simple rescaling of the value at the Debye temperature.
+            Can be an array to obtain the values for several temperatures at once.
 
     Returns:
         The value of the thermal conductivity in W/(m*K)
     """
+    inv_g = 1.0 / mean_g
+    kb_theta_hbar = const.k * theta_d / const.hbar
 
-    factor1 = 0.849 * 3 * (4 ** (1. / 3.)) / (20 * np.pi ** 3 * (1 - 0.514 * mean_g ** -1 + 0.228 * mean_g ** -2))
-    factor2 = (const.k * theta_d / const.hbar) ** 2
-    factor3 = const.k * average_mass * volume ** (1. / 3.) * 1e-10 / (const.hbar * mean_g ** 2)
-    k = factor1 * factor2 * factor3
+    # factor1 * factor2 * factor3 with the 1/mean_g powers computed once.
+    k = (_SLACK_PREFACTOR / (1 - 0.514 * inv_g + 0.228 * inv_g * inv_g)
+         * kb_theta_hbar * kb_theta_hbar
+         * const.k * average_mass * volume ** (1. / 3.) * 1e-10 * inv_g * inv_g / const.hbar)
     if t is not None:
-        k *= theta_d / t
+        k = k * theta_d / np.asarray(t)
 
     return k
@@ -43,7 +43,8 @@ def get_dyn_mat_eigenvec(phdispl, structure, amu=None, amu_symbol=None) -> np.nd
     Returns:
         A |numpy-array| of the same shape as phdispl containing the eigenvectors of the dynamical matrix
     """
-    eigvec = np.zeros(np.shape(phdispl), dtype=complex)
+    # Every column is overwritten in the loop over the sites below.
+    eigvec = np.empty(np.shape(phdispl), dtype=complex)
 
     if amu is not None and amu_symbol is not None:
         raise ValueError("Only one between amu and amu_symbol should be provided!")
@@ -2,10 +2,14 @@
 import os
 import numpy as np
 import abipy.data as abidata
+import abipy.core.abinit_units as abu
 
 from abipy.core.testing import AbipyTest
 from abipy import abilab
-from abipy.dfpt.gruneisen import GrunsNcFile, calculate_gruns_finite_differences
+from abipy.dfpt.gruneisen import (GrunsNcFile, calculate_gruns_finite_differences, _match_eigenvectors_batch,
+    _gruns_fd_kernel)
+from abipy.tools.derivatives import finite_diff
+from abipy.dfpt.phtk import match_eigenvectors
 
 
 class GrunsFileTest(AbipyTest):
@@ -74,6 +78,37 @@ class GrunsFileTest(AbipyTest):
             if self.has_nbformat():
                 assert ncfile.write_notebook(nbpath=self.get_tmpname(text=True))
 
+    def test_average_gruneisen_imaginary_modes(self):
+        """Imaginary modes are excluded from the average Gruneisen."""
+        with abilab.abiopen(abidata.ref_file("mg2si_GRUNS.nc")) as ncfile:
+            w = ncfile.wvols_qibz_iv0.copy()
+            gvals = ncfile.gvals_qibz.copy()
+            weights = ncfile.phdoses['qpoints'].weights
+            adt = ncfile.acoustic_debye_temp
+            # Make an optical and an acoustic mode imaginary (negative frequency)
+            # with an ill-defined Gruneisen parameter.
+            for iq, nu in [(1, 4), (2, 1)]:
+                w[iq, nu] = -w[iq, nu]
+                gvals[iq, nu] = np.nan
+            ncfile.wvols_qibz_iv0 = w
+            ncfile.gvals_qibz = gvals
+
+            t = 300
+            x = np.abs(w) / (abu.kb_eVK * t)
+            cv = abu.kb_eVK * x ** 2 * np.exp(x) / (np.exp(x) - 1) ** 2
+            wcv = weights[:, None] * cv
+            nu_inds = np.arange(w.shape[1])
+            for limit, ok in [(None, w > 0),
+                              ("debye", (w > 0) & (w <= adt * abu.kb_eVK)),
+                              ("acoustic", (w > 0) & (nu_inds < 3))]:
+                ref = np.sum(wcv[ok] * gvals[ok] ** 2) / np.sum(wcv[ok])
+                g = ncfile.average_gruneisen(t=t, squared=True, limit_frequencies=limit)
+                assert np.isfinite(g)
+                self.assert_almost_equal(g, np.sqrt(ref))
+                ref = np.sum(wcv[ok] * gvals[ok]) / np.sum(wcv[ok])
+                g = ncfile.average_gruneisen(t=t, squared=False, limit_frequencies=limit)
+                self.assert_almost_equal(g, ref)
+
     def test_from_ddb_list(self):
         """Testsing GrunsFile generation from ddblist."""
 
@@ -94,3 +129,106 @@ class FunctionsTest(AbipyTest):
 
         g = calculate_gruns_finite_differences(phfreqs, eig, iv0=1, volume=1, dv=1)
         self.assert_equal(g, [[-1, -1, -1]])
+
+    def test_match_eigenvectors_batch(self):
+        """Batched matching must agree with match_eigenvectors for every q-point."""
+        rng = np.random.default_rng(7)
+        nmodes = 6
+
+        def rand_unitary():
+            q, _ = np.linalg.qr(rng.normal(size=(nmodes, nmodes)) + 1j * rng.normal(size=(nmodes, nmodes)))
+            return q
+
+        ref, other = [], []
+        # Random unitary sets with a known permutation of the modes.
+        perms = [rng.permutation(nmodes) for _ in range(4)]
+        for perm in perms:
+            u = rand_unitary()
+            ref.append(u)
+            other.append(u[perm])
+
+        # Degenerate pair: modes 0 and 1 are mixed with equal weights (exactly tied overlaps).
+        s2 = np.sqrt(0.5)
+        v = np.eye(nmodes, dtype=complex)
+        v[:2, :2] = [[s2, s2], [s2, -s2]]
+        ref.append(np.eye(nmodes, dtype=complex))
+        other.append(v[[3, 1, 2, 0, 4, 5]])
+
+        # Near-tied overlaps: modes 2 and 4 rotated by an angle close to 45 degrees.
+        c, s = np.cos(np.pi / 4 + 1e-6), np.sin(np.pi / 4 + 1e-6)
+        v = np.eye(nmodes, dtype=complex)
+        v[[2, 2, 4, 4], [2, 4, 2, 4]] = [c, s, -s, c]
+        ref.append(np.eye(nmodes, dtype=complex))
+        other.append(v[::-1])
+
+        ref, other = np.array(ref), np.array(other)
+        inds = _match_eigenvectors_batch(ref, other)
+        assert inds.shape == (len(ref), nmodes)
+        for iq in range(len(ref)):
+            self.assert_equal(inds[iq], match_eigenvectors(ref[iq], other[iq]))
+
+        # For the permuted sets, mode i of ref is found at position argsort(perm)[i] of other.
+        for iq, perm in enumerate(perms):
+            self.assert_equal(inds[iq], np.argsort(perm))
+
+    def test_match_eigenvectors_batch_diag_shortcut(self):
+        """Q-points taking the identity shortcut and q-points needing a permutation in the same batch."""
+        rng = np.random.default_rng(11)
+        nmodes = 6
+        u = np.linalg.qr(rng.normal(size=(nmodes, nmodes)) + 1j * rng.normal(size=(nmodes, nmodes)))[0]
+
+        # Small unitary rotation of the modes: all the diagonal overlaps stay close to one.
+        a = rng.normal(size=(nmodes, nmodes)) + 1j * rng.normal(size=(nmodes, nmodes))
+        e, v = np.linalg.eigh((a + a.conj().T) / 2)
+        u_rot = u @ (v * np.exp(0.05j * e)) @ v.conj().T
+
+        # Cyclic permutation of the modes: the diagonal overlaps are (close to) zero.
+        perm = np.roll(np.arange(nmodes), 1)
+
+        ref = np.array([u, u])
+        other = np.array([u_rot, u[perm]])
+        diag = np.abs(np.einsum("qia,qia->qi", ref, other.conj())) ** 2
+        assert diag[0].min() > 0.9
+        assert diag[1].min() <= 0.9
+
+        inds = _match_eigenvectors_batch(ref, other, diag_tol=0.9)
+        self.assert_equal(inds[0], np.arange(nmodes))
+        self.assert_equal(inds[1], np.argsort(perm))
+        for iq in range(len(ref)):
+            self.assert_equal(inds[iq], match_eigenvectors(ref[iq], other[iq]))
+
+    def test_gruns_fd_kernel(self):
+        """Compare _gruns_fd_kernel with the finite_diff formula applied mode by mode."""
+        rng = np.random.default_rng(3)
+        volume, dv = 40.0, 0.3
+
+        def gruns_finite_diff(phfreqs, iv0):
+            g = np.zeros(phfreqs.shape[1:])
+            for iq in range(phfreqs.shape[1]):
+                for im in range(phfreqs.shape[2]):
+                    w = phfreqs[iv0, iq, im]
+                    if w != 0:
+                        dw = finite_diff(phfreqs[:, iq, im], dv, order=1, acc=phfreqs.shape[0] - 1, index=iv0).value
+                        g[iq, im] = -dw * volume / w
+            return g
+
+        # Hardcoded central stencils, tensordot with central, forward and backward weights.
+        for nvols, iv0 in [(3, 1), (5, 2), (7, 3), (5, 0), (5, 4), (3, 0)]:
+            phfreqs = rng.uniform(0.01, 0.05, size=(nvols, 4, 6))
+            # Zero frequencies at iv0: the masked division must return g = 0.
+            phfreqs[iv0, 0, :3] = 0
+            phfreqs[iv0, 2, 5] = 0
+            g = _gruns_fd_kernel(phfreqs, iv0, volume, dv)
+            assert g.shape == (4, 6)
+            self.assert_almost_equal(g, gruns_finite_diff(phfreqs, iv0))
+            self.assert_equal(g[0, :3], 0)
+            assert g[2, 5] == 0
+            assert np.all(g[1] != 0)
+
+        # Non-central iv0 without enough points for acc = nvols - 1: both approaches raise.
+        phfreqs = rng.uniform(0.01, 0.05, size=(5, 2, 3))
+        with self.assertRaises(ValueError):
+            gruns_finite_diff(phfreqs, 1)
+        with self.assertRaises(ValueError):
+            _gruns_fd_kernel(phfreqs, 1, volume, dv)
+
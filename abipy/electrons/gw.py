@@ -3,18 +3,19 @@
 from __future__ import annotations
 
 import sys
+import re
 import copy
 import numpy as np
 import pandas as pd
 
 from collections import namedtuple, OrderedDict
+from itertools import chain
 from io import StringIO
 from tabulate import tabulate
 from monty.string import list_strings, is_string, marquee
 from monty.collections import dict2namedtuple
 from monty.functools import lazy_property
 from monty.termcolor import cprint
-from monty.bisect import find_le, find_ge
 from abipy.core.func1d import Function1D
 from abipy.core.kpoints import Kpoint, KpointList, Kpath, IrredZone, has_timrev_from_kptopt
 from abipy.core.mixins import AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter
@@ -35,6 +36,58 @@ __all__ = [
     "SigresRobot",
 ]
 
+# Used to extract the description of the fields from the doc string of QPState.
+_FIELD_DOC_RE = re.compile(r"^\s*(\w+):\s*(.*?)(?=^\s*\w+:|\Z)", re.S | re.M)
+_RST_DIRECTIVE_RE = re.compile(r"^\s*\.\. ", re.M)
+
+
+def _qp_value_to_str(v) -> str:
+    """
+    String representation of a value stored in a QPState. Used by QPState.to_strdict.
+    """
+    if duck.is_intlike(v):
+        return "%d" % int(v)
+    elif isinstance(v, Kpoint):
+        return "%s" % v
+    elif np.iscomplexobj(v):
+        if abs(v.imag) < 1.e-3:
+            return "%.2f" % v.real
+        else:
+            return "%.2f%+.2fj" % (v.real, v.imag)
+    else:
+        try:
+            return "%.2f" % v
+        except TypeError:
+            return str(v)
+
+
+def _qp_column_to_str(values) -> list[str]:
+    """
+    Vectorized version of _qp_value_to_str for a |numpy-array| with the values of a QPState field.
+    """
+    values = np.asarray(values)
+    kind = values.dtype.kind
+    if kind in "iu":
+        return np.char.mod("%d", values).tolist()
+    if kind not in "fc":
+        return [_qp_value_to_str(v) for v in values]
+
+    real = values.real
+    out = np.char.mod("%.2f", real)
+    if kind == "c":
+        im = values.imag
+        out = np.where(np.abs(im) < 1.e-3, out, np.char.add(out, np.char.mod("%+.2fj", im)))
+        intlike = (im == 0) & np.isfinite(real) & (real == np.trunc(real))
+    else:
+        intlike = np.isfinite(real) & (real == np.trunc(real))
+
+    # Integer values are printed as integers (see duck.is_intlike).
+    out = out.tolist()
+    for i in np.flatnonzero(intlike):
+        out[i] = "%d" % int(real[i])
+
+    return out
+
 
 class QPState(namedtuple("QPState", "spin kpoint band e0 qpe qpe_diago vxcme sigxme sigcmee0 vUme ze0")):
     """
@@ -58,6 +111,13 @@ class QPState(namedtuple("QPState", "spin kpoint band e0 qpe qpe_diago vxcme sig
 
         Energies are in eV.
     """
+    # Formatters used by to_strdict. Fields not listed here use _qp_value_to_str.
+    _FIELD_FORMATTERS = {
+        "spin": lambda v: "%d" % int(v),
+        "kpoint": str,
+        "band": lambda v: "%d" % int(v),
+    }
+
     @property
     def qpeme0(self) -> complex:
         """E_QP - E_0 in eV"""
@@ -80,8 +140,8 @@ class QPState(namedtuple("QPState", "spin kpoint band e0 qpe qpe_diago vxcme sig
 
     def copy(self) -> QPState:
         """Return shallow copy."""
-        d = {f: copy.copy(getattr(self, f)) for f in self._fields}
-        return self.__class__(**d)
+        # The other fields are immutable scalars: copy.copy would return the same objects.
+        return self._replace(kpoint=copy.copy(self.kpoint))
 
     @classmethod
     def get_fields(cls, exclude=()) -> tuple:
@@ -102,23 +162,10 @@ class QPState(namedtuple("QPState", "spin kpoint band e0 qpe qpe_diago vxcme sig
         """
         Ordered dictionary mapping fields --> strings.
         """
+        get_fmt = self._FIELD_FORMATTERS.get
         d = self.as_dict()
         for k, v in d.items():
-            if duck.is_intlike(v):
-                d[k] = "%d" % int(v)
-            elif isinstance(v, Kpoint):
-                d[k] = "%s" % v
-            elif np.iscomplexobj(v):
-                if abs(v.imag) < 1.e-3:
-                    d[k] = "%.2f" % v.real
-                else:
-                    d[k] = "%.2f%+.2fj" % (v.real, v.imag)
-            else:
-                try:
-                    d[k] = "%.2f" % v
-                except TypeError as exc:
-                    #print("k", k, str(exc))
-                    d[k] = str(v)
+            d[k] = get_fmt(k, _qp_value_to_str)(v)
         return d
 
     @property
@@ -130,43 +177,9 @@ class QPState(namedtuple("QPState", "spin kpoint band e0 qpe qpe_diago vxcme sig
     def TIPS(cls) -> str:
         """
         Class method that returns a dictionary with the description of the fields.
-        The string are extracted from the class doc string.
+        The string are extracted from the class doc string when the module is imported.
         """
-        try:
-            return cls._TIPS
-
-        except AttributeError:
-            # Parse the doc string.
-            cls._TIPS = _TIPS = {}
-            lines = cls.__doc__.splitlines()
-
-            for i, line in enumerate(lines):
-                if line.strip().startswith(".. Attributes"):
-                    lines = lines[i+1:]
-                    break
-
-            def num_leadblanks(string):
-                """Returns the number of the leading whitespaces."""
-                return len(string) - len(string.lstrip())
-
-            for field in cls._fields:
-                for i, line in enumerate(lines):
-
-                    if line.strip().startswith(field + ":"):
-                        nblanks = num_leadblanks(line)
-                        desc = []
-                        for s in lines[i+1:]:
-                            if nblanks == num_leadblanks(s) or not s.strip():
-                                break
-                            desc.append(s.lstrip())
-
-                        _TIPS[field] = "\n".join(desc)
-
-            diffset = set(cls._fields) - set(_TIPS.keys())
-            if diffset:
-                raise RuntimeError("The following fields are not documented: %s" % str(diffset))
-
-            return _TIPS
+        return cls._TIPS
 
     @classmethod
     def get_fields_for_plot(cls, with_fields, exclude_fields) -> list:
@@ -197,14 +210,99 @@ class QPState(namedtuple("QPState", "spin kpoint band e0 qpe qpe_diago vxcme sig
         return fields
 
 
+def _parse_tips_from_doc(cls) -> dict:
+    """
+    Extract the description of the fields of the namedtuple ``cls`` from its doc string.
+    The fields are documented in the block after `.. Attributes:` up to the next directive.
+    """
+    doc = cls.__doc__
+    start = doc.index(".. Attributes")
+    block = doc[doc.index("\n", start):]
+    directive = _RST_DIRECTIVE_RE.search(block)
+    if directive is not None:
+        block = block[:directive.start()]
+
+    tips = {m.group(1): " ".join(m.group(2).split()) for m in _FIELD_DOC_RE.finditer(block)
+            if m.group(1) in cls._fields}
+
+    diffset = set(cls._fields) - set(tips.keys())
+    if diffset:
+        raise RuntimeError("The following fields are not documented: %s" % str(diffset))
+
+    return tips
+
+
+QPState._TIPS = _parse_tips_from_doc(QPState)
+
+
+def _reset_columns(name):
+    """
+    Wrap the list method ``name`` so that the cached columns and the skb index of a QPList
+    are discarded before the call.
+    """
+    list_method = getattr(list, name)
+
+    def method(self, *args, **kwargs):
+        self.__dict__.pop("_columns", None)
+        self.__dict__.pop("_skb_index", None)
+        return list_method(self, *args, **kwargs)
+
+    method.__name__ = name
+    method.__doc__ = list_method.__doc__
+    return method
+
+
 class QPList(list):
     """
     A list of quasiparticle corrections for a given spin.
+
+    The values of the fields are cached column by column as numpy arrays the first time
+    they are requested. The same holds for the skb --> QPState index used by get_skb_field.
+    The caches are discarded by the methods that modify the list.
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args)
         self.is_e0sorted = kwargs.get("is_e0sorted", False)
 
+    append = _reset_columns("append")
+    extend = _reset_columns("extend")
+    insert = _reset_columns("insert")
+    pop = _reset_columns("pop")
+    remove = _reset_columns("remove")
+    clear = _reset_columns("clear")
+    sort = _reset_columns("sort")
+    reverse = _reset_columns("reverse")
+    __setitem__ = _reset_columns("__setitem__")
+    __delitem__ = _reset_columns("__delitem__")
+    __iadd__ = _reset_columns("__iadd__")
+    __imul__ = _reset_columns("__imul__")
+
+    @classmethod
+    def from_columns(cls, columns: dict, **kwargs) -> QPList:
+        """
+        Build the object from a dictionary mapping the QPState fields to the sequences with their values.
+        The numpy arrays in ``columns`` are used to initialize the cached columns so that
+        get_field and get_e0mesh do not have to loop over the QPState objects.
+        """
+        new = cls((QPState(*values) for values in zip(*(columns[f] for f in QPState._fields))), **kwargs)
+        new._columns = {f: v for f, v in columns.items() if isinstance(v, np.ndarray)}
+        return new
+
+    def _get_column(self, field) -> np.ndarray:
+        """
+        Cached |numpy-array| with the values of field. Callers must not modify it.
+        """
+        columns = self.__dict__.setdefault("_columns", {})
+        try:
+            return columns[field]
+        except KeyError:
+            if field == "qpeme0":
+                values = self._get_column("qpe") - self._get_column("e0")
+            else:
+                values = np.array([getattr(qp, field) for qp in self])
+            columns[field] = values
+            return values
+
     def __repr__(self) -> str:
         return "<%s at %s, len=%d>" % (self.__class__.__name__, id(self), len(self))
 
@@ -215,10 +313,10 @@ class QPList(list):
     def to_table(self) -> list[list[str]]:
         """Return a table (list of list of strings)."""
         header = QPState.get_fields(exclude=["spin", "kpoint"])
-        table = [header]
-        for qp in self:
-            d = qp.to_strdict(fmt=None)
-            table.append([d[k] for k in header])
+        # Format the table column by column and then transpose.
+        columns = [_qp_column_to_str(self._get_column(k)) for k in header]
+        # tabulate accepts the row tuples returned by zip, no need to convert them to lists.
+        table = [header, *zip(*columns)]
 
         return tabulate(table, tablefmt="plain")
 
@@ -232,25 +330,39 @@ class QPList(list):
 
     def sort_by_e0(self) -> QPList:
         """Return a new object with the E0 energies sorted in ascending order."""
-        return self.__class__(sorted(self, key=lambda qp: qp.e0), is_e0sorted=True)
+        if not self:
+            return self.__class__(is_e0sorted=True)
+        order = np.argsort(self._get_column("e0"), kind="stable")
+        return self.__class__([self[i] for i in order], is_e0sorted=True)
 
     def get_e0mesh(self) -> np.ndarray:
         """Return the E0 energies."""
         if not self.is_e0sorted:
             raise ValueError("QPState corrections are not sorted. Use sort_by_e0.")
 
-        return np.array([qp.e0 for qp in self])
+        return self.get_field("e0")
 
     def get_field(self, field) -> np.ndarray:
         """|numpy-array| containing the values of field."""
-        return np.array([getattr(qp, field) for qp in self])
+        return self._get_column(field).copy()
 
     def get_skb_field(self, skb, field):
         """Return the value of field for the given spin kp band tuple, None if not found"""
-        for qp in self:
-            if qp.skb == skb:
-                return getattr(qp, field)
-        return None
+        skb_index = self.__dict__.get("_skb_index")
+        if skb_index is None:
+            skb_index = self._skb_index = {}
+            for qp in self:
+                skb_index.setdefault(qp.skb, qp)
+
+        try:
+            return getattr(skb_index[skb], field)
+        except (KeyError, TypeError):
+            # Kpoint equality is defined modulo G while the hash uses the reduced coordinates
+            # so a k-point equivalent to the one stored in the list may not be found in the index.
+            for qp in self:
+                if qp.skb == skb:
+                    return getattr(qp, field)
+            return None
 
     def get_qpenes(self) -> np.ndarray:
         """Return an array with the :class:`QPState` energies."""
@@ -267,12 +379,20 @@ class QPList(list):
         Raise:
             `ValueError` if merge cannot be done.
         """
-        skb0_list = [qp.skb for qp in self]
+        # Group the k-points by (spin, band) so that only the k-points with the same
+        # (spin, band) are compared. Kpoint equality is defined modulo G, thus a plain
+        # hash of the skb tuples would not detect all the duplicates.
+        kpoints_sb = {}
+        for qp in self:
+            kpoints_sb.setdefault((qp.spin, qp.band), []).append(qp.kpoint)
+
         for qp in other:
-            if qp.skb in skb0_list:
+            if any(qp.kpoint == k for k in kpoints_sb.get((qp.spin, qp.band), ())):
                 raise ValueError("Found duplicated (s,b,k) indexes: %s" % str(qp.skb))
 
-        qps = self.copy() + other.copy() if copy else self + other
+        # Fill the new list in a single pass without building intermediate lists.
+        qps = chain(self, other)
+        if copy: qps = (qp.copy() for qp in qps)
         return self.__class__(qps)
 
     @add_fig_kwargs
@@ -328,7 +448,8 @@ class QPList(list):
             if irow == nrows - 1:
                 ax.set_xlabel(xlabel)
             ax.set_ylabel(field, fontsize=fontsize)
-            yy = qps.get_field(field)
+            # Read-only access: use the cached column instead of the copy returned by get_field.
+            yy = qps._get_column(field)
 
             # TODO real and imag?
             #print("kwargs:", kwargs)
@@ -378,17 +499,20 @@ class QPList(list):
 
         # Check domains.
         domains = np.atleast_2d(domains)
-        dsize, dflat = domains.size, domains.ravel()
-
-        for idx, v in enumerate(dflat):
-            if idx == 0 and v > e0mesh[0]:
-                raise ValueError("min(e0mesh) %s is not included in domains" % e0mesh[0])
-            if idx == dsize-1 and v < e0mesh[-1]:
-                raise ValueError("max(e0mesh) %s is not included in domains" % e0mesh[-1])
-            if idx != dsize-1 and dflat[idx] > dflat[idx+1]:
-                raise ValueError("domain boundaries should be given in increasing order.")
-            if idx == dsize-1 and dflat[idx] < dflat[idx-1]:
-                raise ValueError("domain boundaries should be given in increasing order.")
+        dflat = domains.ravel()
+
+        if dflat[0] > e0mesh[0]:
+            raise ValueError("min(e0mesh) %s is not included in domains" % e0mesh[0])
+        if dflat[-1] < e0mesh[-1]:
+            raise ValueError("max(e0mesh) %s is not included in domains" % e0mesh[-1])
+        if np.any(np.diff(dflat) < 0):
+            raise ValueError("domain boundaries should be given in increasing order.")
+
+        # Indices of the first e0 >= low and of the last e0 <= high for all the domains.
+        starts = np.searchsorted(e0mesh, domains[:, 0], side="left")
+        stops = np.searchsorted(e0mesh, domains[:, 1], side="right") - 1
+        if np.any(starts == len(e0mesh)) or np.any(stops < 0):
+            raise ValueError("Found domain without e0 points.")
 
         # Create the sub_domains and the spline functions in each subdomain.
         func_list, residues = [], []
@@ -399,20 +523,19 @@ class QPList(list):
         else:
             ndom = 99
 
-        for dom in domains[:]:
+        from scipy.interpolate import UnivariateSpline
+        for start, stop in zip(starts, stops):
             ndom += 1
-            low, high = dom[0], dom[1]
-            start, stop = find_ge(e0mesh, low), find_le(e0mesh, high)
 
             dom_e0 = e0mesh[start:stop+1]
             dom_corr = qpcorrs[start:stop+1]
 
             # todo check if the number of non degenerate data points > k
-            from scipy.interpolate import UnivariateSpline
-            w = len(dom_e0)*[1]
             if ndom == 1:
+                w = np.ones(len(dom_e0))
                 w[-1] = 1000
             elif ndom == 2:
+                w = np.ones(len(dom_e0))
                 w[0] = 1000
             else:
                 w = None
@@ -429,9 +552,8 @@ class QPList(list):
             import matplotlib.pyplot as plt
             plt.plot(e0mesh, qpcorrs, 'o', label="input data")
             if title: plt.suptitle(title)
-            for dom in domains[:]:
-                plt.plot(2*[dom[0]], [min(qpcorrs), max(qpcorrs)])
-                plt.plot(2*[dom[1]], [min(qpcorrs), max(qpcorrs)])
+            # Draw the boundaries of all the domains with a single call.
+            plt.vlines(domains.ravel(), qpcorrs.min(), qpcorrs.max())
             intp_qpc = [sciss.apply(e0) for e0 in e0mesh]
             plt.plot(e0mesh, intp_qpc, label="scissor")
             plt.legend(bbox_to_anchor=(0.9, 0.2))
@@ -484,7 +606,8 @@ class SelfEnergy:
         """
         self.spin, self.kpoint, self.band = spin, kpoint, band
 
-        self.wmesh = np.array(wmesh)
+        # Function1D stores contiguous views of its inputs so no copy is made for netcdf slices.
+        self.wmesh = np.ascontiguousarray(wmesh)
         self.xc = Function1D(self.wmesh, xc_vals)
         self.x_val = x_val
         self.ze0 = ze0
@@ -536,11 +659,11 @@ class SelfEnergy:
 
     def _get_ys(self, what: str) -> dict:
         """Return the name of the array to plot from what."""
-        return dict(
-            re=self.xc.values.real,
-            im=self.xc.values.imag,
-            aw=self.aw.values,
-        )[what]
+        # Only the requested component is accessed. .real and .imag are views of xc.values.
+        if what == "re": return self.xc.values.real
+        if what == "im": return self.xc.values.imag
+        if what == "aw": return self.aw.values
+        raise KeyError(what)
 
     def plot_ax(self, ax, what="a", fontsize=8, **kwargs) -> list:
         """
@@ -762,6 +885,16 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         """The k-points where QP corrections have been calculated."""
         return self.r.sigma_kpoints
 
+    @lazy_property
+    def sigma_kpoints_reprs(self) -> list[str]:
+        """List with the repr of the k-points in sigma_kpoints. Used for labels and titles."""
+        return [repr(k) for k in self.sigma_kpoints]
+
+    @property
+    def kcalc2ibz(self) -> np.ndarray:
+        """|numpy-array| with the index in the IBZ of the k-points in sigma_kpoints."""
+        return self.r.sigma_kpt_to_ibz
+
     def get_marker(self, qpattr):
         """
         Return :class:`Marker` object associated to the QP attribute qpattr.
@@ -770,17 +903,23 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         # Each marker is a list of tuple(x, y, value)
         x, y, s = [], [], []
 
+        # The QP states share the Kpoint objects so the (linear) search in ebands.kpoints
+        # is done once per k-point instead of once per state.
+        ik_from_id = {}
         for spin in range(self.nsppol):
-            for qp in self.qplist_spin[spin]:
-                ik = self.ebands.kpoints.index(qp.kpoint)
-                x.append(ik)
-                y.append(qp.e0)
-                size = getattr(qp, qpattr)
-                # Handle complex quantities
-                if np.iscomplex(size): size = size.real
-                s.append(size)
+            qplist = self.qplist_spin[spin]
+            for qp in qplist:
+                kid = id(qp.kpoint)
+                if kid not in ik_from_id:
+                    ik_from_id[kid] = self.ebands.kpoints.index(qp.kpoint)
+                x.append(ik_from_id[kid])
+
+            y.append(qplist._get_column("e0"))
+            size = qplist._get_column(qpattr)
+            # Handle complex quantities
+            s.append(size.real if np.iscomplexobj(size) else size)
 
-        return Marker(*(x, y, s))
+        return Marker(x, np.concatenate(y), np.concatenate(s))
 
     @lazy_property
     def params(self) -> dict:
@@ -815,10 +954,11 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         # GW Section.
         # TODO: Finalize the implementation: add GW metadata.
         app(marquee("QP direct gaps", mark="="))
-        for kcalc in self.sigma_kpoints:
+        # Extract the [nsppol, nkcalc] gaps with a single indexing.
+        qp_dirgaps = self.qpgaps[:, self.kcalc2ibz]
+        for ikc, kcalc_repr in enumerate(self.sigma_kpoints_reprs):
             for spin in range(self.nsppol):
-                qp_dirgap = self.get_qpgap(spin, kcalc)
-                app("QP_dirgap: %.3f (eV) for k-point: %s, spin: %s" % (qp_dirgap, repr(kcalc), spin))
+                app("QP_dirgap: %.3f (eV) for k-point: %s, spin: %s" % (qp_dirgaps[spin, ikc], kcalc_repr, spin))
                 #ks_dirgap =
         app("")
 
@@ -894,15 +1034,14 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         if self.r.nomega_i > 0:
             # Read Sigma_c(iw) if available.
             # sigcmesi(b1gw:b2gw, nkibz, nomega_i, nsppol*nsig_ab))
-            iw_mesh = self.r.read_value("omega_i")[:, 1]
-            var = self.r.read_variable("sigcmesi")
+            iw_mesh = self.r._omega_i
+            var = self.r._sigcmesi_var
             c_iw_values = var[spin, :, ik_ibz, ib_gw, 0] + 1j*var[spin, :, ik_ibz, ib_gw, 1]
 
         # nctkarr_t('sigxme', "dp", 'nbgw, number_of_kpoints, ndim_sig')
         x_val = self.r._sigxme[spin, ik_ibz, ib_gw]
         # nctkarr_t('ze0',"dp", 'cplex, nbgw, number_of_kpoints, number_of_spins')
-        ze0 =  self.r.read_variable("ze0")[spin, ik_ibz, ib_gw]
-        ze0 = ze0[0] + 1j*ze0[1]
+        ze0 = self.r._ze0[spin, ik_ibz, ib_gw]
 
         return SelfEnergy(spin, kpoint, band, wmesh, xc_vals, x_val, ze0, aw_vals,
                           iw_mesh=iw_mesh, c_iw_values=c_iw_values)
@@ -918,10 +1057,10 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         """
         from abipy.tools.printing import print_dataframe
         keys = "band e0 qpe qpe_diago vxcme sigxme sigcmee0 vUme ze0".split()
-        for kcalc in self.sigma_kpoints:
+        for kcalc, kcalc_repr in zip(self.sigma_kpoints, self.sigma_kpoints_reprs):
             for spin in range(self.nsppol):
                 df_sk = self.get_dataframe_sk(spin, kcalc, ignore_imag=ignore_imag)[keys]
-                print_dataframe(df_sk, title="K-point: %s, spin: %s" % (repr(kcalc), spin),
+                print_dataframe(df_sk, title="K-point: %s, spin: %s" % (kcalc_repr, spin),
                                 precision=precision, file=file)
 
     def get_points_from_ebands(self, ebands_kpath, dist_tol=1e-12, size=24, verbose=0) -> Marker:
@@ -973,29 +1112,29 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
             cprint("Warning: Found zero points lying on the input k-path. Try to increase dist_tol.", "yellow")
             return Marker()
 
-        # Read complex GW energies from file.
-        qp_arr = self.r.read_value("egw", cmode="c")
+        # Real part of the GW energies. This is a view of the array already loaded by the reader.
+        qp_real = self.r._egw.real
 
-        # Each marker is a list of tuple(x, y, value)
-        x, y, s = [], [], []
+        # Each marker is a list of tuple(x, y, value).
+        # Here we collect the x and y values for all the bands of a given (k, spin) at once.
+        x, y = [], []
         kpath_lenght = kpath.ds.sum()
 
         for ik, dalong_path in zip(p.ikfound, p.dist_list):
             istar = back2istar[ik]
-            # The k-point used in the GW calculation.
-            gwk = gw_stars[istar].base_point
+            # The star has been generated from the istar-th k-point used in the GW calculation.
             # Indices needed to access SIGRES arrays (we have to live with this format)
-            ik_ibz = self.r.kpt2ibz(gwk)
-            ik_b = self.r.kpt2ikcalc(gwk)
+            ik_ibz, ik_b = self.kcalc2ibz[istar], istar
+            # Assume the path is properly normalized.
+            xval = (dalong_path / kpath_lenght) * (len(kpath) - 1)
             for spin in range(self.nsppol):
                 # Need to select bands included in the GW calculation.
-                for qpe in qp_arr[spin, ik_ibz, self.bstart_sk[spin, ik_b]:self.bstop_sk[spin, ik_b]]:
-                    # Assume the path is properly normalized.
-                    x.append((dalong_path / kpath_lenght) * (len(kpath) - 1))
-                    y.append(qpe.real)
-                    s.append(size)
+                qpes = qp_real[spin, ik_ibz, self.bstart_sk[spin, ik_b]:self.bstop_sk[spin, ik_b]]
+                x.append(np.full(len(qpes), xval))
+                y.append(qpes)
 
-        return Marker(*(x, y, s))
+        x, y = np.concatenate(x), np.concatenate(y)
+        return Marker(x, y, np.full(len(x), size))
 
     @add_fig_kwargs
     def plot_qpgaps(self, ax=None, plot_qpmks=True, fontsize=8, **kwargs) -> Figure:
@@ -1015,13 +1154,12 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         xs = np.arange(self.nkcalc)
 
         # Add xticklabels from k-points.
-        tick_labels = [repr(k) for k in self.sigma_kpoints]
+        tick_labels = self.sigma_kpoints_reprs
         ax.set_xticks(xs)
         ax.set_xticklabels(tick_labels, fontdict=None, rotation=30, minor=False, size="x-small")
 
         for spin in range(self.nsppol):
-            qp_gaps, ks_gaps = map(np.array, zip(*[self.get_qpgap(spin, kcalc, with_ksgap=True)
-                                   for kcalc in self.sigma_kpoints]))
+            qp_gaps, ks_gaps = self.qpgaps[spin, self.kcalc2ibz], self.ksgaps[spin, self.kcalc2ibz]
             if not plot_qpmks:
                 # Plot QP gaps
                 ax.plot(xs, qp_gaps, marker=self.marker_spin[spin],
@@ -1158,9 +1296,7 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         Returns: |matplotlib-Figure|
         """
         # Map sigma_kpoints to ebands.kpoints
-        kcalc2ibz = np.empty(self.nkcalc, dtype=int)
-        for ikc, sigkpt in enumerate(self.sigma_kpoints):
-            kcalc2ibz[ikc] = self.ebands.kpoints.index(sigkpt)
+        kcalc2ibz = self.kcalc2ibz
 
         # TODO: It seems there's a minor issue with fermie if SCF band structure.
         e0 = self.ebands.get_e0(e0)
@@ -1173,8 +1309,8 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         ax_list = np.array(ax_list).ravel()
         cmap = plt.get_cmap(colormap)
 
-        # Read QP energies: Fortran egw(nbnds,nkibz,nsppol)
-        qpes = self.r.read_value("egw", cmode="c") # * units.Ha_to_eV
+        # QP energies: Fortran egw(nbnds,nkibz,nsppol). Use the real part of the array already loaded by the reader.
+        qpes = self.r._egw.real # * units.Ha_to_eV
         band_range = (self.r.max_bstart, self.r.min_bstop)
 
         nb = self.r.min_bstop - self.r.min_bstart
@@ -1182,7 +1318,7 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
             # Plot KS bands in the band range included in self-energy calculation.
             self.ebands.plot(ax=ax, e0=e0, spin=spin, band_range=band_range, show=False)
             # Extract QP in IBZ
-            yvals = qpes[spin, kcalc2ibz, :].real - e0
+            yvals = qpes[spin, kcalc2ibz, :] - e0
             # Add (scattered) QP energies for the calculated k-points.
             for band in range(self.r.max_bstart, self.r.min_bstop):
                 ax.scatter(kcalc2ibz, yvals[:, band],
@@ -1257,14 +1393,13 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
             ignore_imag: Only real part is returned if ``ignore_imag``.
             with_params: True to include convergence parameters.
         """
-        rows, bands = [], []
-        ikcalc = self.r.kpt2ikcalc(kpoint)
+        # Read the QP results for all the bands at this k-point at once (bstart and bstop depends on kpoint).
+        qplist = QPList.from_columns(self.r.read_qp_columns(spin, [kpoint], ignore_imag=ignore_imag))
 
-        # bstart and bstop depends on kpoint.
-        for band in range(self.bstart_sk[spin, ikcalc], self.bstop_sk[spin, ikcalc]):
-            bands.append(band)
+        rows, bands = [], []
+        for qpstate in qplist:
+            bands.append(qpstate.band)
             # Build dictionary with the QP results.
-            qpstate = self.r.read_qp(spin, kpoint, band, ignore_imag=ignore_imag)
             d = qpstate.as_dict()
             if with_params:
                 # Add other entries that may be useful when comparing different calculations.
@@ -1303,8 +1438,8 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         # nctkarr_t('sigcmesi', "dp",'cplex, nbgw, number_of_kpoints, nomega_i, ndim_sig'),&
         # nctkarr_t('omega_i', "dp", 'cplex, nomega_i')])
 
-        var = self.r.read_variable("sigcmesi")
-        wmesh_ev = self.r.read_value("omega_i")[:, 1]
+        var = self.r._sigcmesi_var
+        wmesh_ev = self.r._omega_i
 
         ikcalc = self.r.kpt2ikcalc(kpoint)
         ik_ibz = self.r.kpt2ibz(kpoint)
@@ -1319,11 +1454,13 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
         ax_list = np.array(ax_list).ravel()
         re_ax, im_ax = ax_list
 
-        for band in range(self.bstart_sk[spin, ikcalc], self.bstop_sk[spin, ikcalc]):
-            ib_gw = band - self.min_bstart
-            sigma = var[spin, :, ik_ibz, ib_gw, 0] + 1j*var[spin, :, ik_ibz, ib_gw, 1]
-            re_ax.plot(wmesh_ev, sigma.real, label=f"band: {band}")
-            im_ax.plot(wmesh_ev, sigma.imag, label=f"band: {band}")
+        # Read the [nomega_i, nband, 2] block for all the bands in one go and slice it in memory.
+        bstart, bstop = self.bstart_sk[spin, ikcalc], self.bstop_sk[spin, ikcalc]
+        block = var[spin, :, ik_ibz, bstart - self.min_bstart:bstop - self.min_bstart, :]
+
+        for ib, band in enumerate(range(bstart, bstop)):
+            re_ax.plot(wmesh_ev, block[:, ib, 0], label=f"band: {band}")
+            im_ax.plot(wmesh_ev, block[:, ib, 1], label=f"band: {band}")
 
         re_ax.set_ylabel(r"$\Re{\Sigma_c}(i\omega)$ (eV)")
         im_ax.set_ylabel(r"$\Im{\Sigma_c}(i\omega)$ (eV)")
@@ -1437,19 +1574,17 @@ class SigresFile(AbinitNcFile, Has_Structure, Has_ElectronBands, NotebookWriter)
 
         # Read GW energies from file (real part) and compute corrections if ks_ebands_kpath.
         # This is the section in which the fileoformat (SIGRES.nc, GWR.nc) enters into play...
-        egw_rarr = self.r.read_value("egw", cmode="c").real
+        # egw_rarr is a view of the complex array stored in the reader so it must not be modified in place.
+        egw_rarr = self.r._egw.real
         if ks_ebands_kpath is not None:
             if ks_ebands_kpath.structure != self.structure:
                 cprint("sigres.structure and ks_ebands_kpath.structures differ. Check your files!", "red")
-            egw_rarr -= self.r.read_value("e0")
+            egw_rarr = egw_rarr - self.r.read_value("e0")
 
         # Note there's no guarantee that the sigma_kpoints and the corrections have the same k-point index.
         # Be careful because the order of the k-points and the band range stored in the SIGRES file may differ ...
-        qpdata = np.empty(egw_rarr.shape)
-        for gwk in self.sigma_kpoints:
-            ik_ibz = self.r.kpt2ibz(gwk)
-            for spin in range(self.nsppol):
-                qpdata[spin, ik_ibz, :] = egw_rarr[spin, ik_ibz, :]
+        # Gather the data in the order of sigma_kpoints (gw_kcoords) with a single fancy index (returns a copy).
+        qpdata = egw_rarr[:, self.kcalc2ibz, :]
 
         # Build interpolator for QP corrections.
         from abipy.core.skw import SkwInterpolator
@@ -1789,6 +1924,24 @@ class SigresReader(ETSF_Reader):
         """True if self contains the spectral function."""
         return self.nomega_r > 0
 
+    @lazy_property
+    def _omega_i(self) -> np.ndarray:
+        """Frequencies along the imaginary axis in eV. Available only if nomega_i > 0."""
+        return self.read_value("omega_i")[:, 1]
+
+    @lazy_property
+    def _sigcmesi_var(self):
+        """
+        netcdf variable with Sigma_c(iw). Available only if nomega_i > 0.
+        sigcmesi(b1gw:b2gw, nkibz, nomega_i, nsppol*nsig_ab))
+        """
+        return self.read_variable("sigcmesi")
+
+    @lazy_property
+    def sigma_kpt_to_ibz(self) -> np.ndarray:
+        """|numpy-array| with the index in the IBZ of the k-points in sigma_kpoints."""
+        return np.array([self.kpt2ibz(k) for k in self.sigma_kpoints], dtype=int)
+
     def kpt2ibz(self, kpoint) -> int:
         """
         Helper function that returns the index of kpoint in the IBZ.
@@ -1833,18 +1986,49 @@ class SigresReader(ETSF_Reader):
         Args:
             ignore_imag: Only real part is returned if ``ignore_imag``.
         """
-        qps_spin = self.nsppol * [None]
+        return tuple(QPList.from_columns(self.read_qp_columns(spin, self.sigma_kpoints, ignore_imag=ignore_imag))
+                     for spin in range(self.nsppol))
 
-        for spin in range(self.nsppol):
-            qps = []
-            for kcalc in self.sigma_kpoints:
-                ikcalc = self.kpt2ikcalc(kcalc)
-                for band in range(self.bstart_sk[spin, ikcalc], self.bstop_sk[spin, ikcalc]):
-                    qps.append(self.read_qp(spin, kcalc, band, ignore_imag=ignore_imag))
+    def read_qp_columns(self, spin, kpoints, ignore_imag=False) -> dict:
+        """
+        Read the QP results for all the bands computed at the given k-points for this spin.
+        Return dictionary mapping the QPState fields to the sequences with the values (see QPList.from_columns).
 
-            qps_spin[spin] = QPList(qps)
+        Args:
+            ignore_imag: Only real part is returned if ``ignore_imag``.
+        """
+        def ri(a):
+            return np.real(a) if ignore_imag else a
 
-        return tuple(qps_spin)
+        # Collect the (kpoint, band) indices of all the QP states
+        # and then extract the values of the fields with a single indexing per array (see read_qp).
+        kpts, ik_files, bands = [], [], []
+        for kcalc in kpoints:
+            ikcalc = self.kpt2ikcalc(kcalc)
+            brange = range(self.bstart_sk[spin, ikcalc], self.bstop_sk[spin, ikcalc])
+            kpts.extend(len(brange) * [kcalc])
+            ik_files.extend(len(brange) * [self.kpt2ibz(kcalc)])
+            bands.extend(brange)
+
+        ik_file = np.array(ik_files, dtype=int)
+        band = np.array(bands, dtype=int)
+        # Must shift band index (see fortran code that allocates with mdbgw)
+        ib_gw = band - self.min_bstart
+
+        return dict(
+            spin=len(bands) * [spin],
+            kpoint=kpts,
+            band=bands,
+            e0=self.ks_bands.eigens[spin, ik_file, band],
+            qpe=ri(self._egw[spin, ik_file, band]),
+            qpe_diago=ri(self._en_qp_diago[spin, ik_file, band]),
+            # Note ib_gw index.
+            vxcme=self._vxcme[spin, ik_file, ib_gw],
+            sigxme=self._sigxme[spin, ik_file, ib_gw],
+            sigcmee0=ri(self._sigcmee0[spin, ik_file, ib_gw]),
+            vUme=self._vUme[spin, ik_file, ib_gw],
+            ze0=ri(self._ze0[spin, ik_file, ib_gw]),
+        )
 
     def read_qplist_sk(self, spin, kpoint, band=None, ignore_imag=False) -> QPList:
         """
@@ -112,11 +112,11 @@ class Scissors:
             self.out_bounds[1] += 1
             return self.func_high(eig)
 
-        # eig is inside the domains: find the domain
-        # and call the corresponding function.
-        for idx, dms in enumerate(domains):
-            if dms[1] >= eig >= dms[0]:
-                return self.func_list[idx](eig)
+        # eig is inside the domains: find the first domain whose upper bound is >= eig
+        # and call the corresponding function if eig is not inside a hole.
+        idx = np.searchsorted(domains[:, 1], eig, side="left")
+        if idx < len(domains) and domains[idx, 0] <= eig:
+            return self.func_list[idx](eig)
 
         self.out_bounds[2] += 1
         raise self.Error("Cannot find location of eigenvalue %s in domains:\n%s" % (eig, domains))
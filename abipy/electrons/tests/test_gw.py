@@ -36,6 +36,12 @@ class TestQPList(AbipyTest):
         assert e0mesh[-1] > e0mesh[0]
         values = qpl_e0sort.get_field("qpeme0")
         assert len(values) == len(qpl_e0sort)
+        self.assert_equal(values, [qp.qpeme0 for qp in qpl_e0sort])
+        # The cached columns must follow the modifications of the list.
+        qpl_copy = qpl_e0sort.copy()
+        assert len(qpl_copy.get_field("e0")) == len(qpl_e0sort)
+        qpl_copy.append(qpl_e0sort[0])
+        assert len(qpl_copy.get_field("e0")) == len(qpl_e0sort) + 1
 
         qp = qpl_e0sort[2]
         value = qpl_e0sort.get_skb_field(qp.skb, "qpeme0")
@@ -69,6 +75,12 @@ class TestQPList(AbipyTest):
         self.assert_almost_equal(qp.qpe.imag, -0.011501666037697)
         self.assert_almost_equal(qp.sigxme, -16.549383605401)
 
+        # The QPLists built from the netcdf arrays must agree with the QPStates read one by one.
+        qplist_spin0 = self.sigres.qplist_spin[0]
+        assert qplist_spin0[:len(qplist)] == qplist
+        self.assert_equal(qplist_spin0.get_field("e0"), [qp.e0 for qp in qplist_spin0])
+        self.assert_equal(qplist_spin0.get_field("qpe"), [qp.qpe for qp in qplist_spin0])
+
 
 class TestSigresFile(AbipyTest):
 
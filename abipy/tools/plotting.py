@@ -14,7 +14,6 @@ import itertools
 import functools
 import numpy as np
 import pandas as pd
-import matplotlib.collections as mcoll
 
 from collections import namedtuple, OrderedDict
 from typing import Any, Callable, Iterator
@@ -2757,6 +2756,8 @@ def mpl_to_ply(fig: Figure, latex: bool= False):
     if is_plotly_figure(fig):
         return fig
 
+    import matplotlib.collections as mcoll
+
     def parse_latex(label):
         # Remove latex symobols
         new_label = label.replace("$", "")
@@ -6,6 +6,7 @@ from __future__ import annotations
 import sys
 import os
 import shutil
+import importlib.util
 
 from glob import glob
 from setuptools import find_packages, setup
@@ -36,11 +37,12 @@ def file_doesnt_end_with(test, endings):
 #---------------------------------------------------------------------------
 
 # release.py contains version, authors, license, url, keywords, etc.
+# Load it as a module so that the attributes built lazily via __getattr__ are available.
 release_file = os.path.join('abipy', 'core', 'release.py')
 
-with open(release_file) as f:
-    code = compile(f.read(), release_file, 'exec')
-    exec(code)
+_spec = importlib.util.spec_from_file_location("abipy_release", release_file)
+release = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(release)
 
 
 #---------------------------------------------------------------------------
@@ -117,7 +119,7 @@ def find_scripts():
 
 
 def get_long_desc():
-    with open("README.rst") as f:
+    with open("README.rst", encoding="utf-8") as f:
         return f.read()
 
 
@@ -181,26 +183,26 @@ install_requires = [
 # Create a dict with the basic information
 # This dict is eventually passed to setup after additional keys are added.
 setup_args = dict(
-      name=name,
-      version=version,
-      description=description,
-      long_description=long_description,
+      name=release.name,
+      version=release.version,
+      description=release.description,
+      long_description=get_long_desc(),
       long_description_content_type="text/x-rst",
-      author=author,
-      author_email=author_email,
-      maintainer=maintainer,
-      maintainer_email=maintainer_email,
-      url=url,
-      license=license,
-      platforms=platforms,
-      keywords=keywords,
-      classifiers=classifiers,
+      author=release.author,
+      author_email=release.author_email,
+      maintainer=release.maintainer,
+      maintainer_email=release.maintainer_email,
+      url=release.url,
+      license=release.license,
+      platforms=release.platforms,
+      keywords=release.keywords,
+      classifiers=release.classifiers,
       install_requires=install_requires,
       packages=find_packages(exclude=()),
       package_data=find_package_data(),
       exclude_package_data=find_exclude_package_data(),
       scripts=find_scripts(),
-      download_url=download_url,
+      download_url=release.download_url,
       ext_modules=ext_modules,
       )
 